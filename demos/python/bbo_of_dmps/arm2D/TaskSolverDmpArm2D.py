@@ -39,52 +39,75 @@ class TaskSolverDmpArm2D(TaskSolverDmp):
         assert len(link_lengths) == dmp.dim_dmp()
         self.link_lengths = link_lengths
 
-    def perform_rollout_dmp(self, dmp):
-        """ Perform one rollout for a DMP.
+    def _states_as_cost_vars(self, dmp, ts, xs, xds):
+        """ Convert the states of an integrated DMP into the cost-relevant variables.
 
-        @param dmp: The DMP to integrate.
-        @return: The trajectory generated by the DMP as a matrix.
+        All variables are written directly into one preallocated matrix. The states may have
+        leading batch dimensions, e.g. n_samples X n_time_steps X dim_x.
+
+        @param dmp: The DMP that was integrated.
+        @param ts: The times at which the DMP was integrated.
+        @param xs: The states of the DMP over time.
+        @param xds: The rates of change of the states of the DMP over time.
+        @return: The joint trajectories and link positions as a matrix.
         """
-        ts = np.linspace(0.0, self._integrate_time, self._n_time_steps)
-        xs, xds, _, _ = dmp.analytical_solution(ts)
-        joint_trajs = dmp.states_as_trajectory(ts, xs, xds)
-        # We have the joint trajectories as a Trajectory. Convert them to end-eff.
-        y_links = self.angles_to_link_positions(joint_trajs.ys, self.link_lengths)
-
-        # Cost-vars now contains: ts, joint pos/vel/acc, end-eff pos
-        cost_vars = np.column_stack((joint_trajs.as_matrix(), y_links))
+        n_dofs = dmp.dim_dmp()
+
+        # Cost-vars contains: ts, joint pos/vel/acc, end-eff pos
+        cost_vars = np.empty((*xs.shape[:-1], 1 + 3 * n_dofs + 2 * (n_dofs + 1)))
+        cost_vars[..., 0] = ts
+        ys, yds, ydds = dmp.states_as_pos_vel_acc(xs, xds)
+        for i_var, var in enumerate([ys, yds, ydds]):
+            cost_vars[..., 1 + i_var * n_dofs : 1 + (i_var + 1) * n_dofs] = var
+
+        # We have the joint trajectories. Convert them to link positions.
+        links = cost_vars[..., 1 + 3 * n_dofs :]
+        self.angles_to_link_positions(ys, self.link_lengths, out=links)
         return cost_vars
 
-    def perform_rollout(self, sample, **kwargs):
-        """ Perform rollouts, that is, given a set of samples, determine all the variables that
-        are relevant to evaluating the cost function.
+    def perform_rollouts_batch(self, samples, n_jobs=1):
+        """ Perform rollouts for a batch of samples, integrating the DMP for all samples at once.
+
+        The cost-relevant variables of all samples are also computed in one go.
 
-        @param sample: The sample to perform the rollout for
-        @return: The variables relevant to computing the cost.
+        @param samples: The samples to perform the rollouts for (n_samples X n_dims)
+        @param n_jobs: Ignored, as the rollouts are vectorized rather than distributed.
+        @return: A list with the variables relevant to computing the cost, one for each sample.
         """
-        self._dmp.set_param_vector(sample)
-        return self.perform_rollout_dmp(self._dmp)
+        ts = self._get_ts()
+        xs, xds, _, _ = self._dmp.analytical_solution_batch(samples, ts)
+        return list(self._states_as_cost_vars(self._dmp, ts, xs, xds))
 
     @staticmethod
-    def angles_to_link_positions(angles, link_lengths):
-        n_time_steps = angles.shape[0]
-        n_dofs = angles.shape[1]
-        links_x = np.zeros((n_time_steps, n_dofs + 1))
-        links_y = np.zeros((n_time_steps, n_dofs + 1))
-        for tt in range(n_time_steps):
-            sum_angles = 0.0
-            for i_dof in range(n_dofs):
-                sum_angles += angles[tt, i_dof]
-                ll = link_lengths[i_dof]
-                links_x[tt, i_dof + 1] = links_x[tt, i_dof] + np.cos(sum_angles) * ll
-                links_y[tt, i_dof + 1] = links_y[tt, i_dof] + np.sin(sum_angles) * ll
-
-        # Format for each row: x_0, y_0, x_1, y_1 ... x_end_eff,  y_end_eff
-        links_xyxyxy = np.zeros((n_time_steps, 2 * (n_dofs + 1)))
-        for i_link in range(n_dofs + 1):
-            links_xyxyxy[:, 2 * i_link + 0] = links_x[:, i_link]
-            links_xyxyxy[:, 2 * i_link + 1] = links_y[:, i_link]
-        return links_xyxyxy
+    def angles_to_link_positions(angles, link_lengths, out=None):
+        """ Compute the positions of the links of the arm (forward kinematics).
+
+        @param angles: The joint angles (n_time_steps X n_dofs, or n_samples X n_time_steps X
+            n_dofs for a batch of rollouts)
+        @param link_lengths: The lengths of the links (n_dofs)
+        @param out: Optional array in which to store the link positions (last axis contiguous)
+        @return: The link positions, x_0, y_0, x_1, y_1 ... x_end_eff,  y_end_eff, along the last
+            axis (same leading dimensions as angles)
+        """
+        leading_shape = angles.shape[:-1]
+        n_dofs = angles.shape[-1]
+
+        if out is None:
+            out = np.empty((*leading_shape, 2 * (n_dofs + 1)))
+
+        # The absolute angle of each link is the sum of the joint angles up to that link.
+        sum_angles = np.cumsum(angles, axis=-1)
+
+        # Viewing 'out' as complex numbers x+iy yields the format: x_0, y_0, x_1, y_1 ... in memory.
+        # This way, the x and y positions are scaled and summed in one go, rather than separately.
+        links = out.view(np.complex128)
+        links[..., 0] = 0.0  # The base of the arm
+        np.cos(sum_angles, out=links.real[..., 1:])
+        np.sin(sum_angles, out=links.imag[..., 1:])
+        links[..., 1:] *= link_lengths
+        np.cumsum(links[..., 1:], axis=-1, out=links[..., 1:])
+
+        return out
 
 
 def main():
@@ -234,7 +234,9 @@ def run_optimization(stochastic_field, directory=None):
         gain_weight=1.0,
     )
 
-    # Make task solver, based on a Dmp
+    # Make task solver, based on a Dmp. With this large time step, the desired trajectory (which is
+    # the analytical solution of the DMP, see force_field_simulator.py) differs visibly from the
+    # step-by-step integrated one of earlier versions of this demo.
     dt = 0.05
     integrate_dmp_beyond_tau_factor = 1.2
     task_solver = TaskSolverDmpWithGainsAndForceField(
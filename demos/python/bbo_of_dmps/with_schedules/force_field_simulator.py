@@ -16,17 +16,68 @@
 # along with DmpBbo.  If not, see <http://www.gnu.org/licenses/>.
 """Script to simulate DMP integration with a force field.
 Has been implemented in a separate file to facilitate debugging.
+
+The desired trajectory (and the schedules) are the analytical solution of the DMP. Earlier versions
+integrated the desired trajectory step by step alongside the feedback loop. With large time steps,
+e.g. the dt=0.05 in demo_bbo_of_dmps_with_gains.py, this leads to visible differences (of order dt)
+in plots and results.
 """
 
 # import random
+from functools import lru_cache
 
 import numpy as np
 from matplotlib import pyplot as plt
 
 
+def _feedback_step(
+    ys_cur, yds_cur, ydds_cur, ys_des, yds_des, ydds_des, gain, sqrt_gain, field, dt, tt
+):
+    """
+    Compute the current acceleration at time step tt, and integrate it. The rows tt of the
+    'cur' arrays are written in place.
+    @param ys_cur: Current positions (n_time_steps X dim_y)
+    @param yds_cur: Current velocities (n_time_steps X dim_y)
+    @param ydds_cur: Current accelerations (n_time_steps X dim_y)
+    @param ys_des: Desired positions (n_time_steps X dim_y)
+    @param yds_des: Desired velocities (n_time_steps X dim_y)
+    @param ydds_des: Desired accelerations (n_time_steps X dim_y)
+    @param gain: The P-gain of the PD-controller at time step tt
+    @param sqrt_gain: The D-gain of the PD-controller at time step tt, i.e. sqrt(gain)
+    @param field: The acceleration due to the force field at time step tt
+    @param dt: The duration of the time step
+    @param tt: The time step
+    """
+    # Compute error terms
+    y_err = ys_cur[tt - 1] - ys_des[tt]
+    yd_err = yds_cur[tt - 1] - yds_des[tt]
+
+    # Force due to PD-controller, and due to force field
+    ydds_cur[tt] = ydds_des[tt] - gain * y_err - sqrt_gain * yd_err + field
+
+    # Euler integration
+    yds_cur[tt] = yds_cur[tt - 1] + dt * ydds_cur[tt]
+    ys_cur[tt] = ys_cur[tt - 1] + dt * yds_cur[tt]
+
+
+@lru_cache(maxsize=8)
+def _get_time_steps(integrate_time, n_time_steps):
+    """
+    Get the times at which to integrate. These are the same for each rollout, and therefore only
+    computed once. The returned array is read-only, as it is shared between rollouts.
+    @param integrate_time:  The time to integrate the DMP
+    @param n_time_steps: The number of time steps to integrate the DMP
+    @return: The times at which to integrate
+    """
+    ts = np.linspace(0.0, integrate_time, n_time_steps)
+    ts.setflags(write=False)
+    return ts
+
+
 def perform_rollout(dmp_sched, integrate_time, n_time_steps, field_strength, field_max_time):
     """
-    Perform a rollout with a force field
+    Perform a rollout with a force field. The desired trajectory is the analytical solution of the
+    DMP; only the feedback loop that tracks it is integrated step by step.
     @param dmp_sched:  The DMP to integrate
     @param integrate_time:  The time to integrate the DMP
     @param n_time_steps: The number of time steps to integrate the DMP
@@ -34,54 +85,56 @@ def perform_rollout(dmp_sched, integrate_time, n_time_steps, field_strength, fie
     @param field_max_time: The time at which the (Gaussian) force field has its mode
     @return:
     """
-    ts = np.linspace(0.0, integrate_time, n_time_steps)
+    ts = _get_time_steps(integrate_time, n_time_steps)
     dt = ts[1]
 
+    # All variables are stored in one contiguous buffer; the rollout contains views on it.
+    labels = ["ys_cur", "yds_cur", "ydds_cur", "schedules", "ys_des", "yds_des", "ydds_des"]
+    dim_y = dmp_sched.dim_y
+    buffer = np.zeros([n_time_steps, len(labels) * dim_y + 1])
+
     r = {"ts": ts}  # The rollout containing all relevant cost_vars
-    for v in ["ys_des", "yds_des", "ydds_des", "schedules", "ys_cur", "ydds_cur", "yds_cur"]:
-        r[v] = np.zeros([n_time_steps, dmp_sched.dim_y])
-    r["fields"] = np.zeros([n_time_steps, 1])
-
-    x_des, xd_des, sch = dmp_sched.integrate_start_sched()
-    des = dmp_sched.states_as_pos_vel_acc(x_des, xd_des)
-    for i, v in enumerate(["ys", "yds", "ydds"]):
-        r[v + "_des"][0, :] = des[i]  # Output of integrate_start are values at t=0
+    for i, v in enumerate(labels):
+        r[v] = buffer[:, i * dim_y : (i + 1) * dim_y]
+    r["fields"] = buffer[:, -1:]
+
+    # Force due to force_field (Gaussian over time). Not applied at t=0.
+    w = np.sqrt(0.05 * field_max_time)
+    r["fields"][1:, 0] = field_strength * np.exp(
+        -0.5 * np.square(ts[1:] - field_max_time) / (w * w)
+    )
+
+    # The desired trajectory and schedules do not depend on the perturbations. Compute them for
+    # all time steps in one go, so that only the feedback loop needs to be integrated. Being the
+    # analytical solution rather than the result of integration, the desired trajectory differs
+    # from that of earlier versions of this demo by O(dt).
+    xs, xds, schedules, _, _ = dmp_sched.analytical_solution_sched(ts)
+    r["ys_des"][:], r["yds_des"][:], r["ydds_des"][:] = dmp_sched.states_as_pos_vel_acc(xs, xds)
+    r["schedules"][:] = schedules
+    for v in ["ys", "yds", "ydds"]:
         r[v + "_cur"][0, :] = r[v + "_des"][0, :]  # Current at t=0 is equal ot desired
-    r["schedules"][0, :] = sch
 
-    for tt in range(1, n_time_steps):
+    # Local references to the buffers, to avoid dictionary lookups inside the loop
+    ys_des, yds_des, ydds_des = r["ys_des"], r["yds_des"], r["ydds_des"]
+    ys_cur, yds_cur, ydds_cur = r["ys_cur"], r["yds_cur"], r["ydds_cur"]
+    gains = r["schedules"]
+    sqrt_gains = np.sqrt(gains)  # D-gains, computed for all time steps at once
+    fields = r["fields"][:, 0]
 
-        x_des, xd_des, sch = dmp_sched.integrate_step_sched(dt, x_des)
-        r["ys_des"][tt, :], r["yds_des"][tt, :], r["ydds_des"][
-            tt, :
-        ] = dmp_sched.states_as_pos_vel_acc(x_des, xd_des)
-
-        # Compute error terms
-        y_err = r["ys_cur"][tt - 1, :] - r["ys_des"][tt, :]
-        yd_err = r["yds_cur"][tt - 1, :] - r["yds_des"][tt, :]
-
-        # Force due to PD-controller
-        r["schedules"][tt, :] = sch
-        gain = sch
-        r["ydds_cur"][tt, :] = r["ydds_des"][tt, :] - gain * y_err - np.sqrt(gain) * yd_err
-
-        # Force due to force_field
-        time = ts[tt]
-        max_time = field_max_time
-        w = np.sqrt(0.05 * max_time)
-        r["fields"][tt, 0] = field_strength * np.exp(-0.5 * np.square(time - max_time) / (w * w))
-        r["ydds_cur"][tt, :] += r["fields"][tt, 0]
-
-        # Euler integration
-        r["yds_cur"][tt, :] = r["yds_cur"][tt - 1, :] + dt * r["ydds_cur"][tt, :]
-        r["ys_cur"][tt, :] = r["ys_cur"][tt - 1, :] + dt * r["yds_cur"][tt, :]
-
-    # Compute reference trajectory without perturbation (already done above)
-    # xs, xds, schedules, _, _ = dmp_sched.analytical_solution_sched(ts)
-    # traj = dmp_sched.states_as_trajectory_sched(ts, xs, xds, schedules)
-    # r["ys_des"] = traj.ys
-    # r["yds_des"] = traj.yds
-    # r["ydds_des"] = traj.ydds
+    for tt in range(1, n_time_steps):
+        _feedback_step(
+            ys_cur,
+            yds_cur,
+            ydds_cur,
+            ys_des,
+            yds_des,
+            ydds_des,
+            gains[tt],
+            sqrt_gains[tt],
+            fields[tt],
+            dt,
+            tt,
+        )
 
     return r
 
@@ -302,12 +302,17 @@ class LearningSession:
         @return: The number of updates that have already been performed.
         """
         if not self._root_dir:
-            return self._last_update_added
+            return 0 if self._last_update_added is None else self._last_update_added + 1
         else:
             update_dirs = sorted(glob(str(Path(self._root_dir, "update")) + "[0-9]*"))
             last_dir = update_dirs[-1]
             update_str = Path(last_dir).name.replace("update", "")
-            return int(update_str)
+            n_updates = int(update_str) + 1
+            # In the step-by-step optimization, the directory for the next update already contains
+            # its samples, but the update itself has not been performed yet.
+            if not self.exists("weights", n_updates - 1):
+                n_updates -= 1
+            return n_updates
 
     @staticmethod
     def get_base_name(name, i_update=None, i_sample=None):
@@ -350,7 +355,7 @@ class LearningSession:
             return True
         if self._root_dir is not None:
             abs_basename = Path(self._root_dir, basename)
-            for extension in ["json", "txt", "csv"]:
+            for extension in ["json", "txt", "csv", "npy"]:
                 if os.path.isfile(f"{abs_basename}.{extension}"):
                     return True
         return False
@@ -385,33 +390,39 @@ class LearningSession:
             elif os.path.isfile(f"{abs_basename}.txt"):
                 obj = np.loadtxt(f"{abs_basename}.txt")
 
+            elif os.path.isfile(f"{abs_basename}.npy"):
+                obj = np.load(f"{abs_basename}.npy")
+
             else:
                 raise IOError(f"Could not find file with basename: {abs_basename}")
 
             self._cache[basename] = obj
 
-            return obj
+            return copy.deepcopy(obj)
 
-    def tell(self, obj, name, i_update=None, i_sample=None):
+    def tell(self, obj, name, i_update=None, i_sample=None, binary=False):
         """ Add an object to the database.
 
         @param obj:  The object to add
         @param name:  The name of the file
         @param i_update:  The update number
         @param i_sample:  The sample number
+        @param binary:  Whether to save numpy arrays in binary format (default: False)
         """
         basename = self.get_base_name(name, i_update, i_sample)
         self._cache[basename] = copy.deepcopy(obj)
         if self._root_dir is not None:
-            return LearningSession.save(obj, self._root_dir, basename)
+            return LearningSession.save(obj, self._root_dir, basename, binary)
 
     @staticmethod
-    def save(obj, directory, basename):
+    def save(obj, directory, basename, binary=False):
         """ Save an object to a file.
 
         @param obj: The object to save.
         @param directory: The directory to save it to.
-        @param basename: The basename of the file (".txt"/".csv"/".json" will be added to it)
+        @param basename: The basename of the file (".txt"/".npy"/".csv"/".json" will be added)
+        @param binary: Whether to save numpy arrays in binary format (".npy") rather than as text
+            (default: False)
         @return:
         """
         abs_basename = Path(directory, basename)
@@ -419,7 +430,10 @@ class LearningSession:
         # Make sure directory exists
         os.makedirs(os.path.dirname(abs_basename), exist_ok=True)
 
-        if isinstance(obj, (np.ndarray, list, int)):
+        if binary and isinstance(obj, np.ndarray):
+            filename = f"{abs_basename}.npy"
+            np.save(filename, obj)
+        elif isinstance(obj, (np.ndarray, list, int)):
             filename = f"{abs_basename}.txt"
             np.savetxt(filename, np.atleast_1d(obj))  # noqa
         elif isinstance(obj, pd.DataFrame):
@@ -457,7 +471,8 @@ class LearningSession:
         """
         has_eval = self.exists("cost", 0, "eval")
         if has_eval:
-            cost_eval = self.ask("cost", i_update, "eval")
+            # If there was no evaluation in this update, use the most recent one
+            cost_eval, _ = self.get_last_eval_cost(i_update)
             # Evaluation at the beginning of an update
             i_sample = i_update * self._n_samples_per_update
         else:
@@ -467,6 +482,22 @@ class LearningSession:
             i_sample = (i_update + 0.5) * self._n_samples_per_update
         return cost_eval, i_sample
 
+    def get_last_eval_cost(self, i_update=None):
+        """ Get the most recent evaluation cost, i.e. at or before a given update.
+
+        Evaluations need not be performed at every update, see run_optimization_task().
+
+        @param i_update:  The update number (default: None, i.e. the last update)
+        @return: The most recent evaluation cost and its update number (None, None if no
+            evaluation has been performed yet)
+        """
+        if i_update is None:
+            i_update = self.get_n_updates() - 1  # The last update that has been performed
+        for i_update_eval in range(i_update, -1, -1):
+            if self.exists("cost", i_update_eval, "eval"):
+                return self.ask("cost", i_update_eval, "eval"), i_update_eval
+        return None, None
+
     def get_sample_costs(self, i_update):
         """ Get the costs (one for each sample) for a given update.
 
@@ -31,6 +31,7 @@ class LearningSessionTask(LearningSession):
     """
 
     def __init__(self, n_samples_per_update, directory=None, **kwargs):
+        self._templates = {}  # Working copies of templates, see tell_param_variant()
         super().__init__(n_samples_per_update, directory, **kwargs)
         # self._task_solver = kwargs.get("task_solver", None)
         task = kwargs.get("task", None)
@@ -50,17 +51,99 @@ class LearningSessionTask(LearningSession):
         @param i_update:  The update number
         @param i_sample:  The sample number
         """
+        # Variants of an updated template must be reconstructed from the new version
+        self._templates.pop(name, None)
+
+        # Cost-relevant variables may be large, and single precision suffices to evaluate costs.
+        # They are therefore stored as float32, in binary format. Text would not save any precision.
+        binary = "cost_vars" in name and isinstance(obj, np.ndarray)
+        if binary:
+            obj = obj.astype(np.float32)
+
+        # The superclass saves the Dmp as json (readable by Python)
+        filename = super().tell(obj, name, i_update, i_sample, binary)
+
         # If it's a Dmp, save it in a C++-readable format also
         if "dmp" in name:
             if self._root_dir is not None:
                 basename = self.get_base_name(name, i_update, i_sample)
                 abs_basename = Path(self._root_dir, basename)
-                jc.savejson(f"{abs_basename}.json", obj)
                 jc.savejson_for_cpp(f"{abs_basename}_for_cpp.json", obj)
 
-        filename = super().tell(obj, name, i_update, i_sample)
         return filename
 
+    def tell_param_variant(self, template_name, param_vector, name, i_update=None, i_sample=None):
+        """ Add a variant of an object in the database, which differs only in its parameters.
+
+        Only the parameter vector and the name of the template are stored, rather than the
+        entire object. ask() reconstructs the object from the template when it is requested.
+
+        @param template_name: The name of the template object, e.g. "dmp_initial"
+        @param param_vector: The parameter vector of the variant (see Parameterizable)
+        @param name:  The name of the file
+        @param i_update:  The update number
+        @param i_sample:  The sample number
+        @return: The filename of the complete variant in a C++-readable format if it is a Dmp (with
+            which a rollout can be performed), and the filename of the variant otherwise.
+        """
+        variant = {"template": template_name, "param_vector": np.asarray(param_vector).tolist()}
+        filename = super().tell(variant, f"{name}_variant", i_update, i_sample)
+
+        # If it's a Dmp, save the complete variant in a C++-readable format also
+        if "dmp" in name and self._root_dir is not None:
+            obj = self._get_template(template_name)
+            obj.set_param_vector(param_vector)
+            basename = self.get_base_name(name, i_update, i_sample)
+            abs_basename = Path(self._root_dir, basename)
+            filename = f"{abs_basename}_for_cpp.json"
+            jc.savejson_for_cpp(filename, obj)
+
+        return filename
+
+    def _get_template(self, template_name):
+        """ Get a working copy of a template object for reconstructing variants.
+
+        The copy returned by ask() is made only once, and reused for all variants of the template.
+
+        @param template_name: The name of the template object
+        @return: A copy of the template object
+        """
+        if template_name not in self._templates:
+            self._templates[template_name] = self.ask(template_name)
+        return self._templates[template_name]
+
+    def exists(self, name, i_update=None, i_sample=None):
+        """ Check whether certain information exists in the database.
+
+        @param name:  The name of the file
+        @param i_update:  The update number
+        @param i_sample:  The sample number
+        @return: True if the information (or a variant of it) is available, False otherwise.
+        """
+        if super().exists(name, i_update, i_sample):
+            return True
+        return super().exists(f"{name}_variant", i_update, i_sample)
+
+    def ask(self, name, i_update=None, i_sample=None):
+        """ Get an object from the database.
+
+        Objects that were added with tell_param_variant() are reconstructed from their template.
+
+        @param name:  The name of the file
+        @param i_update:  The update number
+        @param i_sample:  The sample number
+        @return: The object in the database.
+        """
+        if not super().exists(name, i_update, i_sample):
+            if super().exists(f"{name}_variant", i_update, i_sample):
+                variant = super().ask(f"{name}_variant", i_update, i_sample)
+                # ask() returns a copy, so the template cached in the database is not changed
+                obj = self.ask(variant["template"])
+                obj.set_param_vector(np.asarray(variant["param_vector"]))
+                return obj
+
+        return super().ask(name, i_update, i_sample)
+
     def add_rollout(self, i_update, i_sample, sample, cost_vars, cost):
         """
 
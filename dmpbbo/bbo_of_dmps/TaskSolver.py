@@ -16,7 +16,64 @@
 # along with DmpBbo.  If not, see <http://www.gnu.org/licenses/>.
 """ Module for the TaskSolver class. """
 
+import os
+import pickle
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+# Worker processes for perform_rollouts_batch(), which are reused as long as the task solver does
+# not change. "key" is the pickled task solver and the number of workers.
+_pool = {"key": None, "executor": None}
+
+# The copy of the task solver in a worker process, see _init_worker()
+_worker_task_solver = None
+
+
+def _init_worker(task_solver_pickled):
+    """ Initialize a worker process for perform_rollouts_batch().
+
+    The task solver is passed to each worker only once, rather than once for each sample. Worker
+    processes that are forked inherit the state of the random number generator of the parent
+    process. Without reseeding, all workers would generate the same random numbers.
+
+    @param task_solver_pickled: The pickled task solver
+    """
+    global _worker_task_solver
+    _worker_task_solver = pickle.loads(task_solver_pickled)
+    np.random.seed()
+
+
+def _perform_rollout_in_worker(sample):
+    """ Perform a rollout with the task solver of a worker process.
+
+    @param sample: The sample to perform the rollout for
+    @return: The variables relevant to computing the cost.
+    """
+    return _worker_task_solver.perform_rollout(sample)
+
+
+def _get_executor(task_solver, n_workers):
+    """ Get worker processes that have a copy of a task solver.
+
+    The worker processes of the previous call are reused if the task solver has not changed since.
+
+    @param task_solver: The task solver that the workers should use
+    @param n_workers: The number of worker processes
+    @return: The executor with the worker processes
+    """
+    task_solver_pickled = pickle.dumps(task_solver)
+    key = (task_solver_pickled, n_workers)
+    if _pool["key"] != key:
+        if _pool["executor"] is not None:
+            _pool["executor"].shutdown()
+        _pool["executor"] = ProcessPoolExecutor(
+            max_workers=n_workers, initializer=_init_worker, initargs=(task_solver_pickled,)
+        )
+        _pool["key"] = key
+    return _pool["executor"]
 
 
 class TaskSolver(ABC):
@@ -34,3 +91,35 @@ class TaskSolver(ABC):
         @return: The variables relevant to computing the cost.
         """
         pass
+
+    def perform_rollouts_batch(self, samples, n_jobs=1):
+        """ Perform rollouts for a batch of samples.
+
+        The default implementation calls perform_rollout() for each sample. With n_jobs != 1, the
+        rollouts are distributed over worker processes. Each worker has its own copy of the task
+        solver, so perform_rollout() may modify the solver's state. The workers are reused for the
+        next batch, unless the task solver in this process has changed. The numpy random number
+        generator of each worker is seeded independently, so rollouts that use np.random are
+        stochastic, but not reproducible with np.random.seed() in the parent process. Subclasses
+        may override this to process all samples in one go.
+
+        @param samples: The samples to perform the rollouts for (n_samples X n_dims)
+        @param n_jobs: Number of worker processes (default: 1, -1 to use all processors)
+        @return: A list with the variables relevant to computing the cost, one for each sample.
+        """
+        if n_jobs != -1 and n_jobs < 1:
+            raise ValueError(f"n_jobs must be -1 or larger than 0, but is {n_jobs}")
+
+        # Starting processes does not pay off for small batches
+        if n_jobs == 1 or len(samples) < 4:
+            return [self.perform_rollout(sample) for sample in samples]
+
+        n_workers = os.cpu_count() if n_jobs == -1 else n_jobs
+        executor = _get_executor(self, n_workers)
+        # A few chunks for each worker, to balance the load with little communication overhead
+        chunksize = max(1, len(samples) // (4 * n_workers))
+        try:
+            return list(executor.map(_perform_rollout_in_worker, samples, chunksize=chunksize))
+        except BrokenProcessPool:
+            _pool["key"] = None  # Do not reuse the broken worker processes
+            raise
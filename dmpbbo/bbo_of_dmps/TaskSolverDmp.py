@@ -34,14 +34,41 @@ class TaskSolverDmp(TaskSolver):
         self._n_time_steps = int(np.floor(self._integrate_time / dt)) + 1
         self._return_dataframe = return_dataframe
 
+        # The times at which the DMP is integrated are the same for each rollout, see _get_ts()
+        self._ts = None
+
+    def _get_ts(self):
+        """ Get the times at which the DMP is integrated.
+
+        They are computed only once. Task solvers that were saved before the times were stored as
+        a member variable do not have it, so it is not accessed directly.
+
+        @return: The times at which the DMP is integrated.
+        """
+        if getattr(self, "_ts", None) is None:
+            self._ts = np.linspace(0.0, self._integrate_time, self._n_time_steps)
+            self._ts.setflags(write=False)
+        return self._ts
+
     def perform_rollout_dmp(self, dmp):
         """ Perform one rollout for a DMP.
 
         @param dmp: The DMP to integrate.
         @return: The trajectory generated by the DMP as a matrix.
         """
-        ts = np.linspace(0.0, self._integrate_time, self._n_time_steps)
+        ts = self._get_ts()
         xs, xds, forcing_terms, fa_outputs = dmp.analytical_solution(ts)
+        return self._states_as_cost_vars(dmp, ts, xs, xds)
+
+    def _states_as_cost_vars(self, dmp, ts, xs, xds):
+        """ Convert the states of an integrated DMP into the cost-relevant variables.
+
+        @param dmp: The DMP that was integrated.
+        @param ts: The times at which the DMP was integrated.
+        @param xs: The states of the DMP over time.
+        @param xds: The rates of change of the states of the DMP over time.
+        @return: The trajectory generated by the DMP as a matrix.
+        """
         traj = dmp.states_as_trajectory(ts, xs, xds)
         # traj.misc = forcing_terms
 
@@ -59,3 +86,26 @@ class TaskSolverDmp(TaskSolver):
         """
         self._dmp.set_param_vector(sample)
         return self.perform_rollout_dmp(self._dmp)
+
+    def perform_rollouts_batch(self, samples, n_jobs=1):
+        """ Perform rollouts for a batch of samples, integrating the DMP for all samples at once.
+
+        If a subclass overrides perform_rollout() or perform_rollout_dmp(), the rollouts are
+        performed one by one with these methods instead, see TaskSolver.perform_rollouts_batch().
+
+        @param samples: The samples to perform the rollouts for (n_samples X n_dims)
+        @param n_jobs: Number of worker processes. Only used if the rollouts are performed one by
+            one; if they are performed all at once, it is ignored.
+        @return: A list with the variables relevant to computing the cost, one for each sample.
+        """
+        overridden = (
+            type(self).perform_rollout is not TaskSolverDmp.perform_rollout
+            or type(self).perform_rollout_dmp is not TaskSolverDmp.perform_rollout_dmp
+        )
+        if overridden:
+            # The batch integration below would bypass the overridden methods
+            return super().perform_rollouts_batch(samples, n_jobs)
+
+        ts = self._get_ts()
+        xs, xds, _, _ = self._dmp.analytical_solution_batch(samples, ts)
+        return [self._states_as_cost_vars(self._dmp, ts, x, xd) for x, xd in zip(xs, xds)]
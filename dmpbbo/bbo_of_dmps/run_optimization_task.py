@@ -27,6 +27,8 @@ def run_optimization_task(
     n_updates,
     n_samples_per_update,
     directory=None,
+    n_jobs=1,
+    eval_every=1,
 ):
     """ Run the optimization of a task with a task solver
 
@@ -37,8 +39,13 @@ def run_optimization_task(
     @param n_updates: The number of updates in the optimization.
     @param n_samples_per_update:  The number of samples for one update
     @param directory:  The directory to save results to (default: None)
+    @param n_jobs:  Number of processes to perform the rollouts with (default: 1, -1 for all)
+    @param eval_every:  Perform the evaluation rollout only every eval_every updates (default: 1)
     @return: The learning session (see LearningSessionTask)
     """
+    if eval_every < 1:
+        raise ValueError(f"eval_every must be larger than 0, but is {eval_every}")
+
     session = LearningSessionTask(
         n_samples_per_update, directory, task=task, task_solver=task_solver, updater=updater
     )
@@ -50,21 +57,22 @@ def run_optimization_task(
         print(f"Update: {i_update}")
 
         # 0. Get cost of current distribution mean
-        cost_vars_eval = task_solver.perform_rollout(distribution.mean)
-        cost_eval = task.evaluate_rollout(cost_vars_eval, distribution.mean)
+        if i_update % eval_every == 0:
+            cost_vars_eval = task_solver.perform_rollout(distribution.mean)
+            cost_eval = task.evaluate_rollout(cost_vars_eval, distribution.mean)
 
-        # Bookkeeping
-        session.add_eval_task(i_update, distribution.mean, cost_vars_eval, cost_eval)
+            # Bookkeeping
+            session.add_eval_task(i_update, distribution.mean, cost_vars_eval, cost_eval)
 
         # 1. Sample from distribution
         samples = distribution.generate_samples(n_samples_per_update)
 
         # 2. Evaluate the samples
-        costs = []
-        for i_sample, sample in enumerate(samples):
+        # 2A. Perform the rollouts (all at once)
+        cost_vars_per_sample = task_solver.perform_rollouts_batch(samples, n_jobs)
 
-            # 2A. Perform the rollout
-            cost_vars = task_solver.perform_rollout(sample)
+        costs = []
+        for i_sample, (sample, cost_vars) in enumerate(zip(samples, cost_vars_per_sample)):
 
             # 2B. Evaluate the rollout
             cur_cost = task.evaluate_rollout(cost_vars, sample)
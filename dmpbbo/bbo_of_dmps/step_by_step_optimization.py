@@ -16,6 +16,8 @@
 # along with DmpBbo.  If not, see <http://www.gnu.org/licenses/>.
 """ Module with functions to run the optimization of a task in multiple updates. """
 
+import numpy as np
+
 from dmpbbo.bbo_of_dmps.LearningSessionTask import LearningSessionTask
 
 
@@ -28,6 +30,7 @@ def prepare_optimization(
     updater,
     dmp_initial=None,
     save_trajectory=False,
+    eval_every=1,
 ):
     """ Run the optimization of a task with a task solver
 
@@ -39,10 +42,14 @@ def prepare_optimization(
     @param n_samples_per_update:  The number of samples for one update
     @param dmp_initial: The initial DMP.
     @param save_trajectory: Whether to save trajectories also, or only DMPs
+    @param eval_every: Perform the evaluation rollout only every eval_every updates (default: 1)
     @return: The learning session (see LearningSessionTask)
     """
 
-    args = {"task": task, "task_solver": task_solver}
+    if eval_every < 1:
+        raise ValueError(f"eval_every must be larger than 0, but is {eval_every}")
+
+    args = {"task": task, "task_solver": task_solver, "eval_every": eval_every}
     args.update({"distribution_initial": distribution_initial})
     args.update({"updater": updater})
     if dmp_initial is not None:
@@ -58,6 +65,21 @@ def prepare_optimization(
     return session
 
 
+def _get_sample_labels(session, n_samples, i_update):
+    """ Get the labels of the rollouts for an update.
+
+    @param session:  The learning session (LearningSessionTask)
+    @param n_samples:  The number of samples for one update
+    @param i_update: The update number
+    @return: The sample numbers, followed by "eval" if there is an evaluation rollout.
+    """
+    sample_labels = list(range(n_samples))
+    eval_every = int(session.ask("eval_every")) if session.exists("eval_every") else 1
+    if i_update % eval_every == 0:
+        sample_labels.append("eval")
+    return sample_labels
+
+
 def _generate_samples(session, distribution, n_samples, i_update, save_trajectory=False):
 
     samples = distribution.generate_samples(n_samples)
@@ -66,22 +88,21 @@ def _generate_samples(session, distribution, n_samples, i_update, save_trajector
     session.tell(distribution, "distribution", i_update)
     session.tell(samples, "samples", i_update)
 
-    # Load the initial DMP, and then set its perturbed parameters
-    dmp = session.ask("dmp_initial")
+    # One row of parameters for each rollout. The last one is the evaluation rollout (if any),
+    # which has no perturbation.
+    sample_labels = _get_sample_labels(session, n_samples, i_update)
+    param_matrix = samples
+    if "eval" in sample_labels:
+        param_matrix = np.vstack((samples, distribution.mean))
 
-    sample_labels = list(range(n_samples))
-    sample_labels.append("eval")
     filenames = []
-    for i_sample in sample_labels:
+    for i_sample, param_vector in zip(sample_labels, param_matrix):
 
-        if i_sample == "eval":
-            # Evaluation rollout: no perturbation
-            dmp.set_param_vector(distribution.mean)
-        else:
-            dmp.set_param_vector(samples[i_sample, :])
-
-        f = session.tell(dmp, "dmp", i_update, i_sample)
+        # Only store the perturbed parameters of the initial DMP, not the entire DMP. The returned
+        # filename is that of the C++-readable DMP, with which the rollout is performed.
+        f = session.tell_param_variant("dmp_initial", param_vector, "dmp", i_update, i_sample)
         if save_trajectory:
+            dmp = session.ask("dmp", i_update, i_sample)
             ts = dmp.ts_train
             xs, xds, _, _ = dmp.analytical_solution(ts)
             traj = dmp.states_as_trajectory(ts, xs, xds)
@@ -108,13 +129,21 @@ def update_step(session, i_update, save_trajectory=False):
     n_samples = session.ask("n_samples_per_update")
     task = session.ask("task")
 
-    sample_labels = list(range(n_samples))
-    sample_labels.append("eval")
+    # Load the samples for all rollouts at once, rather than loading the DMP of each rollout
+    distribution_prev = session.ask("distribution", i_update)
+    samples = np.atleast_2d(session.ask("samples", i_update))
+    if samples.shape[0] == 1 and n_samples > 1:
+        # Samples in a 1D search space are loaded from file as a vector, i.e. (n,) => (n,1)
+        samples = samples.T
+
+    sample_labels = _get_sample_labels(session, n_samples, i_update)
     for i_sample in sample_labels:
 
         cost_vars = session.ask("cost_vars", i_update, i_sample)
-        dmp = session.ask("dmp", i_update, i_sample)
-        sample = dmp.get_param_vector()
+        if i_sample == "eval":
+            sample = distribution_prev.mean  # Evaluation rollout: no perturbation
+        else:
+            sample = samples[i_sample, :]
 
         costs = task.evaluate_rollout(cost_vars, sample)
 
@@ -125,8 +154,6 @@ def update_step(session, i_update, save_trajectory=False):
 
     # 3. Update parameters
     print("UPDATING DISTRIBUTION")
-    distribution_prev = session.ask("distribution", i_update)
-    samples = session.ask("samples", i_update)
     updater = session.ask("updater")
 
     distribution_new, weights = updater.update_distribution(
@@ -332,6 +332,71 @@ class Dmp(DynamicalSystem, Parameterizable):
 
         n_time_steps = ts.size
 
+        xs, xds, forcing_terms, fa_outputs = self._analytical_solution_subsystems(
+            ts, suppress_forcing_term
+        )
+        xs_goal = xs[:, self.GOAL]
+        xs_damping = xs[:, self.DAMPING]
+
+        # THE REST CANNOT BE DONE ANALYTICALLY
+
+        # Reset the dynamical system, and get the first state
+        local_spring_system = copy.deepcopy(self._spring_system)
+
+        # Set first attractor state and damping
+        local_spring_system.y_attr = self.scale_goal_system(xs_goal[0, :])
+        # spring_system.damping_coefficient is passed scalar if damping has only one number
+        damp = xs_damping[0, :]
+        local_spring_system.damping_coefficient = damp[0] if damp.size == 1 else damp
+
+        # Start integrating spring damper system
+        x_spring, xd_spring = local_spring_system.integrate_start()
+
+        # For convenience
+        SPRING = self.SPRING  # noqa
+        SPRING_Y = self.SPRING_Y  # noqa
+        SPRING_Z = self.SPRING_Z  # noqa
+
+        t0 = 0
+        xs[t0, SPRING] = x_spring
+        xds[t0, SPRING] = xd_spring
+
+        # Add forcing term to the acceleration of the spring state
+        xds[0, SPRING_Z] = xds[0, SPRING_Z] + forcing_terms[t0, :] / self._tau
+
+        for tt in range(1, n_time_steps):
+            dt = ts[tt] - ts[tt - 1]
+
+            # Euler integration
+            xs[tt, SPRING] = xs[tt - 1, SPRING] + dt * xds[tt - 1, SPRING]
+
+            # Set the attractor and damping of the spring system
+            local_spring_system.y_attr = self.scale_goal_system(xs[tt, self.GOAL])
+            local_spring_system.damping_coefficient = xs[tt, self.DAMPING]
+
+            # Integrate spring damper system
+            xds[tt, SPRING] = local_spring_system.differential_equation(xs[tt, SPRING])
+
+            # Add forcing term to the acceleration of the spring state
+            xds[tt, SPRING_Z] = xds[tt, SPRING_Z] + forcing_terms[tt, :] / self._tau
+
+            # Compute y component from z
+            xds[tt, SPRING_Y] = xs[tt, SPRING_Z] / self._tau
+
+        return xs, xds, forcing_terms, fa_outputs
+
+    def _analytical_solution_subsystems(self, ts, suppress_forcing_term=False):
+        """Return analytical solution of the subsystems that can be integrated analytically.
+
+        These are the goal, phase, gating and damping systems. The forcing term is also computed.
+        The spring-damper part of xs and xds is left at zero.
+
+        @param ts: A vector of times for which to compute the analytical solutions.
+        @param suppress_forcing_term: Set the forcing term to zero
+        @return: xs, xds, forcing_terms, fa_outputs
+        """
+        n_time_steps = ts.size
+
         # INTEGRATE SYSTEMS ANALYTICALLY AS MUCH AS POSSIBLE
 
         # Integrate phase
@@ -345,18 +410,7 @@ class Dmp(DynamicalSystem, Parameterizable):
         if suppress_forcing_term:
             fa_outputs.fill(0.0)
 
-        # Gate the output to get the forcing term
-        forcing_terms = fa_outputs * xs_gating
-
-        # Scale the forcing term, if necessary
-        if self._forcing_term_scaling == "G_MINUS_Y0_SCALING":
-            g_minus_y0 = self._y_attr - self._y_init
-            g_minus_y0_rep = np.tile(g_minus_y0, (n_time_steps, 1))
-            forcing_terms *= g_minus_y0_rep
-
-        elif self._forcing_term_scaling == "AMPLITUDE_SCALING":
-            _scaling_amplitudes_rep = np.tile(self._scaling_amplitudes, (n_time_steps, 1))
-            forcing_terms *= _scaling_amplitudes_rep
+        forcing_terms = self._compute_forcing_terms(fa_outputs, xs_gating)
 
         # Get delayed goal
         if self._goal_system is None:
@@ -391,50 +445,114 @@ class Dmp(DynamicalSystem, Parameterizable):
         xs[:, self.DAMPING] = xs_damping
         xds[:, self.DAMPING] = xds_damping
 
-        # THE REST CANNOT BE DONE ANALYTICALLY
+        return xs, xds, forcing_terms, fa_outputs
 
-        # Reset the dynamical system, and get the first state
-        local_spring_system = copy.deepcopy(self._spring_system)
+    def _compute_forcing_terms(self, fa_outputs, xs_gating):
+        """Compute the forcing terms from the outputs of the function approximators.
 
-        # Set first attractor state and damping
-        local_spring_system.y_attr = self.scale_goal_system(xs_goal[0, :])
-        # spring_system.damping_coefficient is passed scalar if damping has only one number
-        damp = xs_damping[0, :]
-        local_spring_system.damping_coefficient = damp[0] if damp.size == 1 else damp
+        @param fa_outputs: The outputs of the function approximators (... x T x dim_dmp)
+        @param xs_gating: The states of the gating system (T x 1)
+        @return: The gated and scaled forcing terms (same shape as fa_outputs)
+        """
+        # Gate the output to get the forcing term
+        forcing_terms = fa_outputs * xs_gating
 
-        # Start integrating spring damper system
-        x_spring, xd_spring = local_spring_system.integrate_start()
+        # Scale the forcing term, if necessary (the scaling is broadcast over the time steps)
+        if self._forcing_term_scaling == "G_MINUS_Y0_SCALING":
+            forcing_terms *= self._y_attr - self._y_init
 
-        # For convenience
-        SPRING = self.SPRING  # noqa
-        SPRING_Y = self.SPRING_Y  # noqa
-        SPRING_Z = self.SPRING_Z  # noqa
+        elif self._forcing_term_scaling == "AMPLITUDE_SCALING":
+            forcing_terms *= self._scaling_amplitudes
 
-        t0 = 0
-        xs[t0, SPRING] = x_spring
-        xds[t0, SPRING] = xd_spring
+        return forcing_terms
 
-        # Add forcing term to the acceleration of the spring state
-        xds[0, SPRING_Z] = xds[0, SPRING_Z] + forcing_terms[t0, :] / self._tau
+    def analytical_solution_batch(self, param_vectors, ts=None):
+        """Return analytical solutions of the system for a batch of parameter vectors.
 
-        for tt in range(1, n_time_steps):
-            dt = ts[tt] - ts[tt - 1]
+        This yields the same results as calling set_param_vector() and analytical_solution() for
+        each parameter vector, but the Euler integration of the spring-damper system is done for
+        all parameter vectors simultaneously. The parameter vector of the Dmp is left unchanged.
 
-            # Euler integration
-            xs[tt, SPRING] = xs[tt - 1, SPRING] + dt * xds[tt - 1, SPRING]
+        @param param_vectors: The parameter vectors (S x get_param_vector_size())
+        @param ts: A vector of times for which to compute the analytical solutions.
+            If None is passed, the ts vector from the trajectory used to train the DMP is used.
+        @return: xs, xds, forcing_terms, fa_outputs: As for analytical_solution(), but with an
+        extra first dimension for the parameter vectors, i.e. S x T x D
+        """
+        if ts is None:
+            if self._ts_train is None:
+                raise ValueError(
+                    "Neither the argument 'ts' nor the member variable self._ts_train was set."
+                )
+            else:
+                ts = self._ts_train  # Set the times to the ones the Dmp was trained on.
 
-            # Set the attractor and damping of the spring system
-            local_spring_system.y_attr = self.scale_goal_system(xs[tt, self.GOAL])
-            local_spring_system.damping_coefficient = xs[tt, self.DAMPING]
+        param_vector_backup = self.get_param_vector()
 
-            # Integrate spring damper system
-            xds[tt, SPRING] = local_spring_system.differential_equation(xs[tt, SPRING])
+        if not isinstance(self._spring_system, SpringDamperSystem):
+            # Batch integration only implemented for spring-damper systems: one at a time.
+            solutions = []
+            for param_vector in param_vectors:
+                self.set_param_vector(param_vector)
+                solutions.append(self.analytical_solution(ts))
+            self.set_param_vector(param_vector_backup)
+            return tuple(np.stack(s) for s in zip(*solutions))
 
-            # Add forcing term to the acceleration of the spring state
-            xds[tt, SPRING_Z] = xds[tt, SPRING_Z] + forcing_terms[tt, :] / self._tau
+        # Everything apart from the spring-damper system is integrated analytically.
+        if "goal" in self._selected_param_names:
+            # The goal system differs between parameter vectors: solve it for each of them.
+            solutions = []
+            ys_attr = []  # Attractor states of the spring-damper system
+            for param_vector in param_vectors:
+                self.set_param_vector(param_vector)
+                solutions.append(self._analytical_solution_subsystems(ts))
+                ys_attr.append(self.scale_goal_system(solutions[-1][0][:, self.GOAL]))
+            xs, xds, forcing_terms, fa_outputs = (np.stack(s) for s in zip(*solutions))
+            ys_attr = np.stack(ys_attr)
 
-            # Compute y component from z
-            xds[tt, SPRING_Y] = xs[tt, SPRING_Z] / self._tau
+        else:
+            # Only the function approximators depend on the parameter vectors. Solve the other
+            # subsystems once, and compute only the forcing terms for each parameter vector.
+            xs_once, xds_once, _, _ = self._analytical_solution_subsystems(ts)
+            fa_outputs = np.empty((len(param_vectors), ts.size, self.dim_dmp()))
+            for i_param, param_vector in enumerate(param_vectors):
+                self.set_param_vector(param_vector)
+                fa_outputs[i_param] = self._compute_func_approx_predictions(xs_once[:, self.PHASE])
+            forcing_terms = self._compute_forcing_terms(fa_outputs, xs_once[:, self.GATING])
+
+            xs = np.repeat(xs_once[np.newaxis], len(param_vectors), axis=0)
+            xds = np.repeat(xds_once[np.newaxis], len(param_vectors), axis=0)
+            # Attractor states of the spring-damper system, broadcast over the parameter vectors
+            ys_attr = self.scale_goal_system(xs_once[:, self.GOAL])[np.newaxis]
+
+        self.set_param_vector(param_vector_backup)
+
+        # THE REST CANNOT BE DONE ANALYTICALLY (but can be done for all samples in parallel)
+
+        # For convenience
+        SPRING = self.SPRING  # noqa
+        SPRING_Y = self.SPRING_Y  # noqa
+        SPRING_Z = self.SPRING_Z  # noqa
+        spring_constant = self._spring_system.spring_constant
+        mass = self._spring_system.mass
+        tau = self._tau
+
+        # Start integrating spring damper system
+        xs[:, 0, SPRING] = self._spring_system.x_init
+
+        for tt in range(ts.size):
+            if tt > 0:
+                # Euler integration
+                dt = ts[tt] - ts[tt - 1]
+                xs[:, tt, SPRING] = xs[:, tt - 1, SPRING] + dt * xds[:, tt - 1, SPRING]
+
+            # Integrate spring damper system, with forcing term added to the acceleration
+            y = xs[:, tt, SPRING_Y]
+            z = xs[:, tt, SPRING_Z]
+            damping = xs[:, tt, self.DAMPING]
+            zd = (-spring_constant * (y - ys_attr[:, tt, :]) - damping * z) / (mass * tau)
+            xds[:, tt, SPRING_Y] = z / tau
+            xds[:, tt, SPRING_Z] = zd + forcing_terms[:, tt, :] / tau
 
         return xs, xds, forcing_terms, fa_outputs
 
@@ -538,11 +656,12 @@ class Dmp(DynamicalSystem, Parameterizable):
     def states_as_pos_vel_acc(self, x_in, xd_in):
         """ Convert the dynamical system states into positions, velocities and accelerations.
 
-        @param x_in:  State (n_samples X dim_x)
-        @param xd_in:  Derivative of state (n_samples X dim_x)
-        @return: positions, velocities and accelerations over time (each n_samples X dim_y)
+        @param x_in:  State (dim_x, or n_time_steps X dim_x)
+        @param xd_in:  Derivative of state (dim_x, or n_time_steps X dim_x)
+        @return: positions, velocities and accelerations (each dim_y, or n_time_steps X dim_y)
         """
-        return x_in[self.SPRING_Y], xd_in[self.SPRING_Y], xd_in[self.SPRING_Z] / self._tau
+        y, z = self.SPRING_Y, self.SPRING_Z
+        return x_in[..., y], xd_in[..., y], xd_in[..., z] / self._tau
 
     def states_as_trajectory(self, ts, x_in, xd_in):
         """Get the output of a DMP dynamical system as a trajectory.
@@ -21,6 +21,7 @@ import numpy as np
 from matplotlib import pyplot as plt
 
 from dmpbbo.dmps.Dmp import Dmp
+from dmpbbo.functionapproximators.FunctionApproximatorRBFN import FunctionApproximatorRBFN
 
 
 class DmpWithSchedules(Dmp):
@@ -105,6 +106,11 @@ class DmpWithSchedules(Dmp):
                 f"{len(self._func_apps_schedules)} "
             )
 
+        if FunctionApproximatorRBFN.share_meta_parameters(self._func_apps_schedules):
+            # Same inputs and basis functions: train all dimensions at once.
+            FunctionApproximatorRBFN.train_batch(self._func_apps_schedules, inputs, targets)
+            return
+
         for i_dim in range(len(self._func_apps_schedules)):
             self._func_apps_schedules[i_dim].train(inputs, targets[:, i_dim])
 
@@ -125,27 +131,37 @@ class DmpWithSchedules(Dmp):
             else:
                 ts = self._ts_train  # Set the times to the ones the Dmp was trained on.
 
-        n_time_steps = ts.size
         xs, xds, forcing_terms, fa_outputs = super().analytical_solution(ts)
 
-        schedules = np.ndarray((n_time_steps, len(self._func_apps_schedules)))
-        for i_dim in range(len(self._func_apps_schedules)):
-            schedules[:, i_dim] = self._func_apps_schedules[i_dim].predict(xs[:, self.PHASE])
+        schedules = self._compute_schedules(xs[:, self.PHASE])
         schedules = self._enforce_schedule_bounds(schedules)
 
         return xs, xds, schedules, forcing_terms, fa_outputs
 
+    def _compute_schedules(self, phase_state):
+        """Compute the outputs of the function approximators for the schedules.
+
+        @param phase_state: The phase states for which the outputs are computed (n_time_steps x 1)
+        @return: The outputs of the function approximators (n_time_steps x dim_schedules)
+        """
+        phase_state = phase_state.reshape(-1, 1)
+        if FunctionApproximatorRBFN.share_basis_functions(self._func_apps_schedules):
+            # Compute the basis function activations only once for all dimensions.
+            return FunctionApproximatorRBFN.predict_shared_basis(
+                self._func_apps_schedules, phase_state
+            )
+
+        schedules = np.empty((phase_state.shape[0], len(self._func_apps_schedules)))
+        for i_dim in range(len(self._func_apps_schedules)):
+            schedules[:, i_dim] = self._func_apps_schedules[i_dim].predict(phase_state)
+        return schedules
+
     def _enforce_schedule_bounds(self, schedules):
         if self.min_schedules is None and self.max_schedules is None:
             # No bounds, simply return schedules
             return schedules
-        if schedules.ndim == 1:
-            schedules = schedules.reshape((schedules.shape[0], 1))
-        for i_dim in range(len(self._func_apps_schedules)):
-            min_sched = self.min_schedules[i_dim] if self.min_schedules else None
-            max_sched = self.max_schedules[i_dim] if self.max_schedules else None
-            schedules[:, i_dim] = np.clip(schedules[:, i_dim], min_sched, max_sched)
-        return schedules
+        # Clip in place. The bounds (one for each dimension) are broadcast over the time steps.
+        return np.clip(schedules, self.min_schedules, self.max_schedules, out=schedules)
 
     def integrate_start_sched(self, y_init=None):
         """ Start integrating the DMP with schedules with a new initial state.
@@ -156,10 +172,7 @@ class DmpWithSchedules(Dmp):
         """
         xs, xds = super().integrate_start(y_init)
 
-        n_schedules = len(self._func_apps_schedules)
-        schedules = np.ndarray((n_schedules,))
-        for i_dim in range(n_schedules):
-            schedules[i_dim] = self._func_apps_schedules[i_dim].predict(xs[self.PHASE])
+        schedules = self._compute_schedules(xs[self.PHASE])[0]
         schedules = self._enforce_schedule_bounds(schedules)
 
         return xs, xds, schedules
@@ -174,9 +187,7 @@ class DmpWithSchedules(Dmp):
         """
         x, xd = super().integrate_step(dt, x)
 
-        schedules = np.ndarray((len(self._func_apps_schedules),))
-        for i_dim in range(len(self._func_apps_schedules)):
-            schedules[i_dim] = self._func_apps_schedules[i_dim].predict(x[self.PHASE])
+        schedules = self._compute_schedules(x[self.PHASE])[0]
         schedules = self._enforce_schedule_bounds(schedules)
 
         return x, xd, schedules
@@ -16,26 +16,72 @@
 # along with DmpBbo.  If not, see <http://www.gnu.org/licenses/>.
 """ Module for the FunctionApproximator class. """
 
+import warnings
 from abc import abstractmethod
+from functools import lru_cache
 
-import matplotlib.pyplot as plt
 import numpy as np
-from mpl_toolkits.mplot3d import Axes3D
 
 from dmpbbo.functionapproximators.Parameterizable import Parameterizable
 
 
+@lru_cache(maxsize=8)
+def _get_grid_cached(inputs_min, inputs_max, n_samples_per_dim, dtype):
+    """
+    Get a grid of input samples. As the same grid is often requested repeatedly, e.g. when plotting
+    several function approximators trained on the same data, the last grids are cached. The
+    returned arrays are read-only, as they are shared between callers.
+    See FunctionApproximator._get_grid() for the parameters, which are passed as tuples here.
+    @param inputs_min: The min values for the grid (tuple, one for each input dimension)
+    @param inputs_max: The max values for the grid (tuple, one for each input dimension)
+    @param n_samples_per_dim: The number of samples in each dimension (tuple or None)
+    @param dtype: The data type of the grid
+    @return: The samples on the grid (n_samples X n_dims), and n_samples_per_dim
+    """
+    inputs_min = np.array(inputs_min)
+    inputs_max = np.array(inputs_max)
+    n_dims = inputs_min.size
+    if n_dims == 1:
+        n_samples_per_dim = 101 if n_samples_per_dim is None else n_samples_per_dim[0]
+        inputs_grid = np.linspace(inputs_min, inputs_max, n_samples_per_dim, dtype=dtype)
+
+    else:
+        if n_samples_per_dim is None:
+            n_samples_per_dim = np.full(n_dims, 21 if n_dims == 2 else 11)
+        n_samples_per_dim = np.array(n_samples_per_dim)
+        n_samples_per_dim.setflags(write=False)
+        axes = [
+            np.linspace(inputs_min[i], inputs_max[i], n_samples_per_dim[i], dtype=dtype)
+            for i in range(n_dims)
+        ]
+
+        # The last dimension varies fastest, i.e. for 2D, the rows are (x1s[0], x2s[0]),
+        # (x1s[0], x2s[1]) ... (x1s[1], x2s[0]) ...
+        # Each (sparse) axis of the mesh is broadcast directly into its column of the grid.
+        inputs_grid = np.empty((np.prod(n_samples_per_dim), n_dims), dtype=dtype)
+        inputs_on_grid = inputs_grid.reshape(*n_samples_per_dim, n_dims)
+        for i_dim, axis in enumerate(np.meshgrid(*axes, indexing="ij", sparse=True)):
+            inputs_on_grid[..., i_dim] = axis
+
+    inputs_grid.setflags(write=False)
+    return inputs_grid, n_samples_per_dim
+
+
 class FunctionApproximator(Parameterizable):
     """Base class for all function approximators.
 
     See https://github.com/stulp/dmpbbo/blob/master/tutorial/functionapproximators.md
     """
 
+    # Data type of the grids for plotting, for which single precision is more than sufficient.
+    PLOT_DTYPE = np.float32
+
     def __init__(self, meta_params, model_param_names):
         self._meta_params = meta_params
         self._model_params = {name: None for name in model_param_names}
         self._dim_input = None
         self._selected_param_names = None
+        self._selected_offsets = None
         self._inputs_training = None
         self._targets_training = None
 
@@ -48,13 +94,23 @@ class FunctionApproximator(Parameterizable):
         """
         # Ensure second dimension, i.e. shape = (30,) => (30,1)
         inputs = inputs.reshape(inputs.shape[0], -1)
-        self._model_params = self._train(inputs, targets, self._meta_params, **kwargs)
-        self._dim_input = inputs.shape[1]
+        model_params = self._train(inputs, targets, self._meta_params, **kwargs)
+        self._set_trained_model_params(model_params, inputs.shape[1])
         if kwargs.get("save_training_data", False):
             self._inputs_training = inputs
             self._targets_training = targets
         return self._model_params
 
+    def _set_trained_model_params(self, model_params, dim_input):
+        """ Set the model parameters that result from training.
+
+        @param model_params: Model parameters of the function approximator.
+        @param dim_input: The dimensionality of the inputs used for training.
+        """
+        self._model_params = model_params
+        self._dim_input = dim_input
+        self._selected_offsets = None  # Sizes of the parameters may have changed
+
     def predict(self, inputs):
         """ Make predictions for (new) input data.
 
@@ -112,20 +168,34 @@ class FunctionApproximator(Parameterizable):
         """
         if isinstance(names, str):
             names = [names]  # Convert to list
-        self._selected_param_names = names
+
+        # The keys of the dict are a set-like view, so each name is looked up in constant time.
+        possible_names = self._model_params.keys()
+        unknown_names = [name for name in names if name not in possible_names]
+        if unknown_names:
+            # One warning for all unknown names, rather than one for each
+            warnings.warn(
+                f"Ignoring unknown parameter names {unknown_names}. Possible names are: "
+                f"{sorted(possible_names)}"
+            )
+
+        self._selected_param_names = tuple(name for name in names if name in possible_names)
+        self._selected_offsets = None
 
     def get_param_vector(self):
+        """Get a vector containing the values of the selected parameters."""
         if self._selected_param_names is None:
             return np.array(0)
 
-        """Get a vector containing the values of the selected parameters."""
         if not self.is_trained():
             raise ValueError("FunctionApproximator is not trained.")
 
-        values = []
-        for label in self._selected_param_names:
-            values.extend(self._model_params[label].flatten())
-        return np.asarray(values)
+        # Copy the parameters into one preallocated vector, rather than into an intermediate list
+        offsets = self._get_selected_offsets()
+        values = np.empty(offsets[-1])
+        for i_label, label in enumerate(self._selected_param_names):
+            values[offsets[i_label] : offsets[i_label + 1]] = self._model_params[label].ravel()
+        return values
 
     def set_param_vector(self, values):
         """Set a vector containing the values of the selected parameters."""
@@ -138,60 +208,83 @@ class FunctionApproximator(Parameterizable):
                 f"({self.get_param_vector_size()}) "
             )
 
-        offset = 0
-        for label in self._selected_param_names:
-            expected_shape = self._model_params[label].shape
-            cur_n_values = np.prod(expected_shape)
-            cur_values = values[offset : offset + cur_n_values]
-            self._model_params[label] = np.reshape(cur_values, expected_shape)
-            offset += cur_n_values
+        offsets = self._get_selected_offsets()
+        for i_label, label in enumerate(self._selected_param_names):
+            params = self._model_params[label]
+            cur_values = np.reshape(values[offsets[i_label] : offsets[i_label + 1]], params.shape)
+            if isinstance(params, np.ndarray) and params.flags.writeable:
+                # Copy in place, so that no new array is allocated for the parameters
+                np.copyto(params, cur_values)
+            else:
+                # Copy, because cur_values may be a view on the values passed by the caller
+                self._model_params[label] = np.array(cur_values)
 
     def get_param_vector_size(self):
         """Get the size of the vector containing the values of the selected parameters."""
         if self._selected_param_names is None:
             return 0
-        size = 0
-        for label in self._selected_param_names:
-            if label in self._model_params:
-                size += np.prod(self._model_params[label].shape)
-        return size
+        return self._get_selected_offsets()[-1]
+
+    def _get_selected_offsets(self):
+        """ Get the offsets of the selected parameters in the parameter vector.
+
+        The offsets only change when other parameters are selected, or when the function
+        approximator is retrained. Therefore, they are cached.
+
+        @return: The offsets of the selected parameters. The last one is the size of the vector.
+        """
+        # The cache may be absent in function approximators that were loaded from json
+        offsets = getattr(self, "_selected_offsets", None)
+        if offsets is None:
+            offsets = [0]
+            for label in self._selected_param_names:
+                size = self._model_params[label].size if label in self._model_params else 0
+                offsets.append(offsets[-1] + size)
+            self._selected_offsets = offsets
+        return offsets
+
+    def _get_axis(self, ax=None, fig=None):
+        """ Get the axis to plot on.
+
+        @param ax: Axis to plot on. If it is not None, it is returned as is.
+        @param fig: Figure on which to create a new axis (default: None, then a new figure is
+            created)
+        @return: The axis to plot on.
+        """
+        if ax is not None:
+            return ax
+
+        import matplotlib.pyplot as plt  # Only needed when plotting
 
-    def _get_axis(self, fig=None):
         if not fig:
             fig = plt.figure(figsize=(6, 6))
         if self.dim_input() == 1:
             return fig.add_subplot(111)
         elif self.dim_input() == 2:
-            return fig.add_subplot(111, projection=Axes3D.name)
+            return fig.add_subplot(111, projection="3d")
         else:
             raise ValueError(f"Cannot create axis with dim_input = {self.dim_input()}")
 
     @staticmethod
     def _get_grid(inputs_min, inputs_max, n_samples_per_dim=None):
-        n_dims = inputs_min.size
-        if n_dims == 1:
-            if n_samples_per_dim is None:
-                n_samples_per_dim = 101
-            inputs_grid = np.linspace(inputs_min, inputs_max, n_samples_per_dim)
-
-        elif n_dims == 2:
-            if n_samples_per_dim is None:
-                n_samples_per_dim = np.atleast_1d([21, 21])
-            n_samples = np.prod(n_samples_per_dim)
-            # Here comes naive inefficient implementation...
-            x1s = np.linspace(inputs_min[0], inputs_max[0], n_samples_per_dim[0])
-            x2s = np.linspace(inputs_min[1], inputs_max[1], n_samples_per_dim[1])
-            inputs_grid = np.zeros((n_samples, n_dims))
-            ii = 0
-            for x1 in x1s:
-                for x2 in x2s:
-                    inputs_grid[ii, 0] = x1
-                    inputs_grid[ii, 1] = x2
-                    ii += 1
-        else:
-            raise ValueError(f"Cannot create axis with n_dims = {n_dims}.")
-
-        return inputs_grid, n_samples_per_dim
+        """ Get a grid of input samples, e.g. for plotting.
+
+        @param inputs_min: The min values for the grid (one for each input dimension)
+        @param inputs_max: The max values for the grid (one for each input dimension)
+        @param n_samples_per_dim: The number of samples in each dimension (default: None, then
+            101 samples for 1D, 21 per dimension for 2D, and 11 per dimension otherwise)
+        @return: The samples on the grid (n_samples X n_dims, of type PLOT_DTYPE), and
+            n_samples_per_dim. Grids are cached, so the returned arrays are read-only.
+        """
+        # Tuples (rather than arrays) are passed, because they can be used as keys for the cache
+        if n_samples_per_dim is not None:
+            n_samples_per_dim = tuple(np.atleast_1d(n_samples_per_dim).tolist())
+        return _get_grid_cached(
+            tuple(np.atleast_1d(inputs_min).tolist()),
+            tuple(np.atleast_1d(inputs_max).tolist()),
+            n_samples_per_dim,
+            np.dtype(FunctionApproximator.PLOT_DTYPE).str,
+        )
 
     @staticmethod
     def _plot_grid_values(inputs, activations, ax, n_samples_per_dim):
@@ -203,23 +296,16 @@ class FunctionApproximator(Parameterizable):
             lines = ax.plot(inputs, activations, "-")
 
         elif n_dims == 2:
-            n_basis_functions = len(activations[0])
-            basis_functions_to_plot = range(n_basis_functions)
-
             inputs_0_on_grid = np.reshape(inputs[:, 0], n_samples_per_dim)
             inputs_1_on_grid = np.reshape(inputs[:, 1], n_samples_per_dim)
+            # Reshape the activations of all basis functions at once (n_samples_per_dim X n_bfs)
+            activations_on_grid = np.reshape(activations, (*n_samples_per_dim, -1))
             lines = []
-            # values_range = np.amax(activations) - np.amin(activations)
-            for i_basis_function in basis_functions_to_plot:
-                # cur_color = colors[i_basis_function]
-                cur_activations = activations[:, i_basis_function]
-                # Make plotting easier by leaving out small numbers
-                # cur_activations[numpy.abs(cur_activations)<values_range*0.001] = numpy.nan
-                activations_on_grid = np.reshape(cur_activations, n_samples_per_dim)
+            for i_basis_function in range(activations_on_grid.shape[-1]):
                 cur_lines = ax.plot_wireframe(
                     inputs_0_on_grid,
                     inputs_1_on_grid,
-                    activations_on_grid,
+                    activations_on_grid[..., i_basis_function],
                     linewidth=0.5,
                     rstride=1,
                     cstride=1,
@@ -238,6 +324,9 @@ class FunctionApproximator(Parameterizable):
 
         @param inputs_min: The min values for the grid
         @param inputs_max:  The max values for the grid
+        @param kwargs:
+        - ax: Axis to plot on (default: None, then a new axis is created)
+        - grid: The grid as returned by _get_grid(), if it has already been computed
         @return: line handles and axis
         """
         pass
@@ -247,12 +336,18 @@ class FunctionApproximator(Parameterizable):
 
         @param inputs_min: The min values for the grid
         @param inputs_max:  The max values for the grid
+        @param kwargs:
+        - ax: Axis to plot on (default: None, then a new axis is created)
+        - grid: The grid as returned by _get_grid(), if it has already been computed
         @return: line handles and axis
         """
-        ax = kwargs.get("ax") or self._get_axis()
+        import matplotlib.pyplot as plt  # Only needed when plotting
 
-        inputs, n_samples_per_dim = FunctionApproximator._get_grid(inputs_min, inputs_max)
-        outputs = self.predict(inputs)
+        ax = self._get_axis(ax=kwargs.get("ax"))
+
+        grid = kwargs.get("grid") or FunctionApproximator._get_grid(inputs_min, inputs_max)
+        inputs, n_samples_per_dim = grid
+        outputs = self._predict_in_chunks(inputs)
 
         h = []
         if self.dim_input() == 1:
@@ -271,14 +366,45 @@ class FunctionApproximator(Parameterizable):
 
         return h, ax
 
+    def _predict_in_chunks(self, inputs, max_chunk_elements=1000000):
+        """ Make predictions for a large number of inputs, e.g. a grid, in chunks.
+
+        Temporary arrays in predict() are typically n_samples X n_basis_functions (or
+        n_samples X n_training_samples for GPR). Predicting in chunks bounds their size.
+
+        @param inputs: Input data (n_samples X n_dims_input)
+        @param max_chunk_elements: Maximum number of elements in the temporary arrays per chunk
+        @return: Predictions (n_samples X n_dims_output)
+        """
+        # The centers of the basis functions (or the training inputs for GPR)
+        centers = self._model_params.get("centers", self._model_params.get("inputs"))
+        n_centers = 1 if centers is None else centers.shape[0]
+        chunk_size = max(1, max_chunk_elements // n_centers)
+
+        n_samples = inputs.shape[0]
+        if n_samples <= chunk_size:
+            return self.predict(inputs)
+
+        outputs = None
+        for start in range(0, n_samples, chunk_size):
+            cur_outputs = self.predict(inputs[start : start + chunk_size])
+            if outputs is None:
+                outputs = np.empty((n_samples, *cur_outputs.shape[1:]), dtype=cur_outputs.dtype)
+            outputs[start : start + chunk_size] = cur_outputs
+        return outputs
+
     def plot_predictions(self, inputs, **kwargs):
         """ Plot the predictions of a function approximator for given inputs.
 
         @param inputs: The input samples (n_samples X n_input_dims )
         @return: line handles and axis
         """
+        import matplotlib.pyplot as plt  # Only needed when plotting
+        from matplotlib.collections import LineCollection
+        from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
         targets = kwargs.get("targets", [])
-        ax = kwargs.get("ax") or self._get_axis()
+        ax = self._get_axis(ax=kwargs.get("ax"))
         plot_residuals = kwargs.get("plot_residuals", True)
 
         outputs = self.predict(inputs)
@@ -292,23 +418,26 @@ class FunctionApproximator(Parameterizable):
             if len(targets) > 0:
                 h_targets = ax.plot(inputs, targets, line_style)
                 if plot_residuals:
-                    for ii in range(len(inputs)):
-                        x = [inputs[ii], inputs[ii]]
-                        y = [targets[ii], outputs[ii]]
-                        h = ax.plot(x, y, "-")
-                        h_residuals.append(h)
+                    # One collection of line segments, rather than one line for each residual
+                    segments = np.stack(
+                        (np.column_stack((inputs, targets)), np.column_stack((inputs, outputs))),
+                        axis=1,
+                    )
+                    h_residuals = LineCollection(segments)
+                    ax.add_collection(h_residuals)
             h_outputs = ax.plot(inputs, outputs, line_style)
 
         elif self.dim_input() == 2:
             if len(targets) > 0:
                 h_targets = ax.plot(inputs[:, 0], inputs[:, 1], targets, line_style)
                 if plot_residuals:
-                    for ii in range(len(inputs)):
-                        x0 = [inputs[ii, 0], inputs[ii, 0]]
-                        x1 = [inputs[ii, 1], inputs[ii, 1]]
-                        y = [targets[ii], outputs[ii]]
-                        h = ax.plot(x0, x1, y, "-")
-                        h_residuals.append(h)
+                    # One collection of 3D line segments, rather than one line for each residual
+                    segments = np.empty((len(inputs), 2, 3))
+                    segments[:, :, :2] = inputs[:, np.newaxis, :]
+                    segments[:, 0, 2] = targets
+                    segments[:, 1, 2] = outputs
+                    h_residuals = Line3DCollection(segments)
+                    ax.add_collection3d(h_residuals)
             h_outputs = ax.plot(inputs[:, 0], inputs[:, 1], outputs, line_style)
 
         else:
@@ -339,14 +468,16 @@ class FunctionApproximator(Parameterizable):
                 # Plot for the inputs that were used for training
                 inputs = self._inputs_training
 
-        ax = kwargs.get("ax") or self._get_axis()
+        ax = self._get_axis(ax=kwargs.get("ax"))
         targets = kwargs.get("targets", self._targets_training)
         plot_residuals = kwargs.get("plot_residuals", True)
         plot_model_parameters = kwargs.get("plot_model_parameters", False)
 
         inputs_min = np.min(inputs, axis=0)
         inputs_max = np.max(inputs, axis=0)
+        # The grid is the same for the model parameters and predictions: compute it only once.
+        grid = FunctionApproximator._get_grid(inputs_min, inputs_max)
         self.plot_predictions(inputs, targets=targets, ax=ax, plot_residuals=plot_residuals)
         if plot_model_parameters:
-            self.plot_model_parameters(inputs_min, inputs_max, ax=ax)
-        return self.plot_predictions_grid(inputs_min, inputs_max, ax=ax)
+            self.plot_model_parameters(inputs_min, inputs_max, ax=ax, grid=grid)
+        return self.plot_predictions_grid(inputs_min, inputs_max, ax=ax, grid=grid)
@@ -16,7 +16,7 @@
 # along with DmpBbo.  If not, see <http://www.gnu.org/licenses/>.
 
 import numpy as np
-from matplotlib import pyplot as plt
+from scipy.linalg import LinAlgError, cho_factor, cho_solve
 
 from dmpbbo.functionapproximators.basis_functions import Gaussian
 from dmpbbo.functionapproximators.FunctionApproximator import FunctionApproximator
@@ -49,7 +49,7 @@ class FunctionApproximatorGPR(FunctionApproximator):
     def _train(inputs, targets, meta_params, **kwargs):
 
         model_params = {
-            "inputs": inputs,
+            "inputs": np.copy(inputs),  # set_param_vector() may change model parameters in place
             "lengths": np.full(inputs.shape, meta_params["lengths"]),
             "max_covariance": meta_params["max_covariance"],
         }
@@ -57,8 +57,13 @@ class FunctionApproximatorGPR(FunctionApproximator):
         # Compute the Gram matrix (every input point is itself a center)
         gram = FunctionApproximatorGPR._activations(inputs, model_params)
 
-        gram_inv = np.linalg.inv(gram)
-        gram_inv_targets = gram_inv @ targets
+        # Solve gram * gram_inv_targets = targets with the Cholesky factorization of the Gram
+        # matrix, rather than computing its inverse explicitly.
+        try:
+            gram_inv_targets = cho_solve(cho_factor(gram), targets)
+        except LinAlgError:
+            # The Gram matrix is not numerically positive definite, e.g. for near-duplicate inputs
+            gram_inv_targets = np.linalg.solve(gram, targets)
 
         model_params["gram_inv_targets"] = gram_inv_targets  # Required to compute mean
         # model_params["gram_inv"] = gram_inv  # Required to compute variance
@@ -71,29 +76,31 @@ class FunctionApproximatorGPR(FunctionApproximator):
         weights = model_params["gram_inv_targets"]
         activations = FunctionApproximatorGPR._activations(inputs, model_params)
 
-        weighted_acts = np.zeros(activations.shape)
-        for ii in range(activations.shape[1]):
-            weighted_acts[:, ii] = activations[:, ii] * weights[ii]
-
-        return weighted_acts.sum(axis=1)
+        # Weighted sum of the activations for all inputs, as one matrix-vector product. Targets may
+        # have been a column vector during training: always return a vector.
+        return (activations @ weights).ravel()
 
     def plot_model_parameters(self, inputs_min, inputs_max, **kwargs):
         """ Plot a representation of the model parameters on a grid.
 
         @param inputs_min: The min values for the grid
         @param inputs_max:  The max values for the grid
+        @param kwargs:
+        - ax: Axis to plot on (default: None, then a new axis is created)
+        - grid: The grid as returned by _get_grid(), if it has already been computed
         @return: line handles and axis
         """
-        inputs, n_samples_per_dim = FunctionApproximator._get_grid(inputs_min, inputs_max)
+        import matplotlib.pyplot as plt  # Only needed when plotting
+
+        grid = kwargs.get("grid") or FunctionApproximator._get_grid(inputs_min, inputs_max)
+        inputs, n_samples_per_dim = grid
 
         weights = self._model_params["gram_inv_targets"]
         activations = FunctionApproximatorGPR._activations(inputs, self._model_params)
 
-        weighted_acts = np.zeros(activations.shape)
-        for ii in range(activations.shape[1]):
-            weighted_acts[:, ii] = activations[:, ii] * weights[ii]
+        weighted_acts = activations * weights
 
-        ax = kwargs.get("ax") or self._get_axis()
+        ax = self._get_axis(ax=kwargs.get("ax"))
 
         # lines = self._plot_grid_values(inputs, activations, ax, n_samples_per_dim)
         lines = self._plot_grid_values(inputs, weighted_acts, ax, n_samples_per_dim)
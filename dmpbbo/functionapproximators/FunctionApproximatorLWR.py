@@ -17,7 +17,6 @@
 """ Module for the FunctionApproximatorLWR class. """
 
 import numpy as np
-from matplotlib import pyplot as plt
 
 from dmpbbo.functionapproximators.basis_functions import Gaussian
 from dmpbbo.functionapproximators.FunctionApproximator import FunctionApproximator
@@ -125,13 +124,18 @@ class FunctionApproximatorLWR(FunctionApproximator):
 
         @param inputs_min: The min values for the grid
         @param inputs_max:  The max values for the grid
+        @param kwargs:
+        - ax: Axis to plot on (default: None, then a new axis is created)
+        - grid: The grid as returned by _get_grid(), if it has already been computed
         @return: line handles and axis
         """
+        import matplotlib.pyplot as plt  # Only needed when plotting
 
-        inputs, n_samples_per_dim = FunctionApproximator._get_grid(inputs_min, inputs_max)
+        grid = kwargs.get("grid") or FunctionApproximator._get_grid(inputs_min, inputs_max)
+        inputs, n_samples_per_dim = grid
         activations = self._activations(inputs, self._model_params)
 
-        ax = kwargs.get("ax") or self._get_axis()
+        ax = self._get_axis(ax=kwargs.get("ax"))
 
         lines = self._plot_grid_values(inputs, activations, ax, n_samples_per_dim)
         alpha = 1.0 if self.dim_input() < 2 else 0.3
@@ -18,7 +18,6 @@
 
 
 import numpy as np
-from matplotlib import pyplot as plt
 
 from dmpbbo.functionapproximators.basis_functions import Gaussian
 from dmpbbo.functionapproximators.FunctionApproximator import FunctionApproximator
@@ -57,9 +56,10 @@ class FunctionApproximatorRBFN(FunctionApproximator):
         height = meta_params["intersection_height"]
         centers, widths = Gaussian.get_centers_and_widths(inputs, n_bfs_per_dim, height)
 
+        # Copy, because set_param_vector() may change the model parameters in place
         model_params = {
-            "centers": meta_params.get("centers", centers),
-            "widths": meta_params.get("widths", widths),
+            "centers": np.array(meta_params.get("centers", centers)),
+            "widths": np.array(meta_params.get("widths", widths)),
         }
 
         # Get the activations of the basis functions
@@ -88,20 +88,104 @@ class FunctionApproximatorRBFN(FunctionApproximator):
             weighted_acts[:, ii] = acts[:, ii] * model_params["weights"][ii]
         return weighted_acts.sum(axis=1)
 
+    @staticmethod
+    def share_basis_functions(function_approximators):
+        """ Determine whether RBFNs have been trained and have the same basis functions.
+
+        @param function_approximators: A list of function approximators
+        @return: True if all are trained RBFNs with the same centers and widths, False otherwise.
+        """
+        fa_first = function_approximators[0]
+        for fa in function_approximators:
+            if not isinstance(fa, FunctionApproximatorRBFN) or not fa.is_trained():
+                return False
+            for name in ["centers", "widths"]:
+                if not np.array_equal(fa._model_params[name], fa_first._model_params[name]):
+                    return False
+        return True
+
+    @staticmethod
+    def predict_shared_basis(function_approximators, inputs):
+        """ Make predictions with several RBFNs that have the same basis functions.
+
+        The activations of the basis functions are computed only once, and the predictions of all
+        RBFNs are then computed with one matrix multiplication.
+
+        @param function_approximators: RBFNs for which share_basis_functions() is True
+        @param inputs: Input data (n_samples X n_dims_input)
+        @return: Predictions (n_samples X len(function_approximators))
+        """
+        inputs = inputs.reshape(inputs.shape[0], -1)
+        model_params = function_approximators[0]._model_params
+        acts = FunctionApproximatorRBFN._activations(inputs, model_params)
+        weights = np.column_stack([fa._model_params["weights"] for fa in function_approximators])
+        return acts @ weights
+
+    @staticmethod
+    def share_meta_parameters(function_approximators):
+        """ Determine whether RBFNs have the same meta-parameters.
+
+        RBFNs with the same meta-parameters that are trained on the same inputs will have the same
+        basis functions.
+
+        @param function_approximators: A list of function approximators
+        @return: True if all are RBFNs with the same meta-parameters, False otherwise.
+        """
+        fa_first = function_approximators[0]
+        for fa in function_approximators:
+            if not isinstance(fa, FunctionApproximatorRBFN):
+                return False
+            if fa._meta_params.keys() != fa_first._meta_params.keys():
+                return False
+            for name, value in fa._meta_params.items():
+                if not np.array_equal(value, fa_first._meta_params[name]):
+                    return False
+        return True
+
+    @staticmethod
+    def train_batch(function_approximators, inputs, targets):
+        """ Train several RBFNs on the same inputs, but with different targets.
+
+        The basis functions and their activations are computed only once, and the weights of all
+        RBFNs are then determined by solving one least-squares problem with multiple targets.
+
+        @param function_approximators: RBFNs for which share_meta_parameters() is True
+        @param inputs: Input data (n_samples X n_dims_input)
+        @param targets: Target data (n_samples X len(function_approximators))
+        """
+        inputs = inputs.reshape(inputs.shape[0], -1)
+        meta_params = function_approximators[0]._meta_params
+        model_params = FunctionApproximatorRBFN._train(inputs, targets, meta_params)
+
+        # Distribute the weights (n_bfs X len(function_approximators)) over the RBFNs
+        for i_fa, fa in enumerate(function_approximators):
+            fa_model_params = {
+                "centers": np.copy(model_params["centers"]),
+                "widths": np.copy(model_params["widths"]),
+                "weights": np.copy(model_params["weights"][:, i_fa : i_fa + 1]),
+            }
+            fa._set_trained_model_params(fa_model_params, inputs.shape[1])
+
     def plot_model_parameters(self, inputs_min, inputs_max, **kwargs):
         """ Plot a representation of the model parameters on a grid.
 
         @param inputs_min: The min values for the grid
         @param inputs_max:  The max values for the grid
+        @param kwargs:
+        - ax: Axis to plot on (default: None, then a new axis is created)
+        - grid: The grid as returned by _get_grid(), if it has already been computed
         @return: line handles and axis
         """
-        inputs, n_samples_per_dim = FunctionApproximator._get_grid(inputs_min, inputs_max)
+        import matplotlib.pyplot as plt  # Only needed when plotting
+
+        grid = kwargs.get("grid") or FunctionApproximator._get_grid(inputs_min, inputs_max)
+        inputs, n_samples_per_dim = grid
         activations = self._activations(inputs, self._model_params)
         weighted_acts = np.zeros(activations.shape)
         for ii in range(activations.shape[1]):
             weighted_acts[:, ii] = activations[:, ii] * self._model_params["weights"][ii]
 
-        ax = kwargs.get("ax") or self._get_axis()
+        ax = self._get_axis(ax=kwargs.get("ax"))
 
         # lines = self._plot_grid_values(inputs, activations, ax, n_samples_per_dim)
         lines = self._plot_grid_values(inputs, weighted_acts, ax, n_samples_per_dim)
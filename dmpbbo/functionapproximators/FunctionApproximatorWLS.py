@@ -45,7 +45,8 @@ class FunctionApproximatorWLS(FunctionApproximator):
         use_offset = meta_params["use_offset"]
         regularization = meta_params["regularization"]
 
-        n_samples = targets.size
+        # targets may also be a matrix (n_samples X n_outputs), which yields one slope per column
+        n_samples = targets.shape[0]
 
         inputs = inputs.reshape(n_samples, -1)
 
@@ -109,6 +110,6 @@ class FunctionApproximatorWLS(FunctionApproximator):
         @param inputs_max:  The max values for the grid
         @return:
         """
-        ax = kwargs.get("ax") or self._get_axis()
+        ax = self._get_axis(ax=kwargs.get("ax"))
         # No model parameters to plot
         return [], ax
@@ -73,39 +73,32 @@ class Gaussian(BasisFunction):
             widths = widths.reshape(n_basis_functions, 1)
             inputs = inputs.reshape(n_samples, 1)
 
-        kernel_activations = np.ones([n_samples, n_basis_functions])
-
         if normalized_basis_functions and n_basis_functions == 1:
             # Normalizing one Gaussian basis function with itself leads to 1 everywhere.
-            kernel_activations.fill(1.0)
-            return kernel_activations
-
-        for bb in range(n_basis_functions):
-            # Here, we compute the values of a (unnormalized) multi-variate Gaussian:
-            #   activation = exp(-0.5*(x-mu)*Sigma^-1*(x-mu))
-            # Because Sigma is diagonal in our case, this simplifies to
-            #   activation = exp(\sum_d=1^D [-0.5*(x_d-mu_d)^2/Sigma_(d,d)])
-            #              = \prod_d=1^D exp(-0.5*(x_d-mu_d)^2/Sigma_(d,d))
-            # This last product is what we compute below incrementally
-
-            for i_dim in range(n_dims):
-                c = centers[bb, i_dim]
-                w = widths[bb, i_dim]
-                for i_s in range(n_samples):
-                    x = inputs[i_s, i_dim]
-                    kernel_activations[i_s, bb] *= np.exp(-0.5 * np.square(x - c) / (w * w))
+            return np.ones([n_samples, n_basis_functions])
+
+        # Here, we compute the values of a (unnormalized) multi-variate Gaussian:
+        #   activation = exp(-0.5*(x-mu)*Sigma^-1*(x-mu))
+        # Because Sigma is diagonal in our case, this simplifies to
+        #   activation = exp(\sum_d=1^D [-0.5*(x_d-mu_d)^2/Sigma_(d,d)])
+        # The sum is accumulated for all samples and basis functions at once, one dimension at a
+        # time, so that only n_samples X n_basis_functions temporaries are needed.
+        exponents = np.zeros([n_samples, n_basis_functions])
+        for i_dim in range(n_dims):
+            scaled_diffs = inputs[:, i_dim, np.newaxis] - centers[:, i_dim]
+            scaled_diffs /= widths[:, i_dim]
+            exponents += np.square(scaled_diffs, out=scaled_diffs)
+        exponents *= -0.5
+        kernel_activations = np.exp(exponents, out=exponents)
 
         if normalized_basis_functions:
             # Normalize the basis value; they should sum to 1.0 for each time step.
-            for i_sample in range(n_samples):
-                sum_kernel_activations = kernel_activations[i_sample, :].sum()
-                for i_basis in range(n_basis_functions):
-                    if sum_kernel_activations == 0.0:
-                        # Apparently, no basis function was active. Set all to same value
-                        kernel_activations[i_sample, i_basis] = 1.0 / n_basis_functions
-                    else:
-                        # Standard case, normalize so that they sum to 1.0
-                        kernel_activations[i_sample, i_basis] /= sum_kernel_activations
+            sum_kernel_activations = kernel_activations.sum(axis=1, keepdims=True)
+            no_activation = sum_kernel_activations[:, 0] == 0.0
+            sum_kernel_activations[no_activation] = 1.0  # Avoid division by zero
+            kernel_activations /= sum_kernel_activations
+            # Apparently, no basis function was active for these samples. Set all to same value
+            kernel_activations[no_activation] = 1.0 / n_basis_functions
 
         return kernel_activations
 
@@ -0,0 +1,254 @@
+# This file is part of DmpBbo, a set of libraries and programs for the
+# black-box optimization of dynamical movement primitives.
+# Copyright (C) 2022 Freek Stulp
+#
+# DmpBbo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# DmpBbo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with DmpBbo.  If not, see <http://www.gnu.org/licenses/>.
+""" Tests for bbo_of_dmps package """
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+from dmpbbo.bbo.DistributionGaussian import DistributionGaussian
+from dmpbbo.bbo.updaters import UpdaterMean
+from dmpbbo.bbo_of_dmps.LearningSessionTask import LearningSessionTask
+from dmpbbo.bbo_of_dmps.run_optimization_task import run_optimization_task
+from dmpbbo.bbo_of_dmps.step_by_step_optimization import prepare_optimization, update_step
+from dmpbbo.bbo_of_dmps.Task import Task
+from dmpbbo.bbo_of_dmps.TaskSolver import TaskSolver
+from dmpbbo.bbo_of_dmps.TaskSolverDmp import TaskSolverDmp
+from dmpbbo.dmps.Dmp import Dmp
+from dmpbbo.dmps.Trajectory import Trajectory
+from dmpbbo.functionapproximators.FunctionApproximatorRBFN import FunctionApproximatorRBFN
+from tests.integration.get_trajectory import get_trajectory
+
+
+def get_dmp():
+    """ Get a DMP trained on a trajectory, with the weights selected for optimization.
+
+    @return: The DMP
+    """
+    traj = get_trajectory()
+    function_apps = [FunctionApproximatorRBFN(6, 0.7) for _ in range(traj.dim)]
+    dmp = Dmp.from_traj(traj, function_apps)
+    dmp.set_selected_param_names("weights")
+    return dmp
+
+
+def test_learning_session_task_variants(tmp_path):
+    """ Test storing DMP variants, and reconstructing them from a session loaded from disk. """
+    dmp = get_dmp()
+    params = dmp.get_param_vector()
+    rng = np.random.default_rng(0)
+    samples = params + rng.normal(0.0, 10.0, (4, params.size))
+
+    session = LearningSessionTask(len(samples), tmp_path, dmp_initial=dmp)
+    for i_sample, sample in enumerate(samples):
+        filename = session.tell_param_variant("dmp_initial", sample, "dmp", 0, i_sample)
+        assert filename.endswith("_for_cpp.json")
+        assert os.path.isfile(filename)
+
+    # Loading the session from the directory caches the template when it is first asked for
+    session = LearningSessionTask.from_dir(tmp_path)
+    for i_sample in reversed(range(len(samples))):
+        dmp_sample = session.ask("dmp", 0, i_sample)
+        assert np.allclose(dmp_sample.get_param_vector(), samples[i_sample])
+        # Reconstructing variants must not change the template
+        assert np.allclose(session.ask("dmp_initial").get_param_vector(), params)
+
+    # Writing new variants must not change the template either
+    session.tell_param_variant("dmp_initial", samples[0], "dmp", 1, 0)
+    assert np.allclose(session.ask("dmp_initial").get_param_vector(), params)
+
+
+class TaskSolverRandom(TaskSolver):
+    """ Task solver whose rollouts use numpy's random number generator. """
+
+    def perform_rollout(self, sample):
+        """ Perform a rollout, which takes a while.
+
+        @param sample: The sample to perform the rollout for
+        @return: Twice the sample, a random number, and the id of the process
+        """
+        time.sleep(0.1)  # So that the rollouts are distributed over several workers
+        return np.array([2.0 * sample[0], np.random.standard_normal(), os.getpid()])
+
+
+def test_perform_rollouts_batch():
+    """ Test performing rollouts in the main process and in worker processes. """
+    task_solver = TaskSolverRandom()
+    samples = np.arange(8.0).reshape(8, 1)
+
+    # Too few samples to start worker processes: rollouts are performed in this process
+    rollouts = np.array(task_solver.perform_rollouts_batch(samples[:3], n_jobs=2))
+    assert np.array_equal(rollouts[:, 0], 2.0 * samples[:3, 0])
+    assert np.all(rollouts[:, 2] == os.getpid())
+
+    # Rollouts in worker processes
+    rollouts = np.array(task_solver.perform_rollouts_batch(samples, n_jobs=2))
+    assert np.array_equal(rollouts[:, 0], 2.0 * samples[:, 0])
+    assert np.all(rollouts[:, 2] != os.getpid())
+    # Each worker must have its own random numbers
+    assert len(np.unique(rollouts[:, 1])) == len(samples)
+
+    # The workers are reused, unless the task solver has changed
+    rollouts_again = np.array(task_solver.perform_rollouts_batch(samples, n_jobs=2))
+    assert set(rollouts_again[:, 2]) <= set(rollouts[:, 2])
+    task_solver.changed = True
+    rollouts_changed = np.array(task_solver.perform_rollouts_batch(samples, n_jobs=2))
+    assert not set(rollouts_changed[:, 2]) & set(rollouts[:, 2])
+
+    for n_jobs in [0, -2]:
+        with pytest.raises(ValueError):
+            task_solver.perform_rollouts_batch(samples, n_jobs=n_jobs)
+
+
+class TaskDistance(Task):
+    """ Task in which the cost-relevant variables should be close to 0.5. """
+
+    def evaluate_rollout(self, cost_vars, sample):
+        """ The cost function which defines the task.
+
+        @param cost_vars: The cost-relevant variables
+        @param sample: The sample from which the rollout was generated
+        @return: The squared distance to 0.5
+        """
+        return [np.sum(np.square(cost_vars - 0.5))]
+
+
+class TaskSolverIdentity(TaskSolver):
+    """ Task solver whose cost-relevant variables are the sample itself. """
+
+    def perform_rollout(self, sample):
+        """ Perform a rollout.
+
+        @param sample: The sample to perform the rollout for
+        @return: The sample
+        """
+        return np.array(sample)
+
+
+def test_run_optimization_task_eval_every(tmp_path):
+    """ Test performing evaluation rollouts only every few updates. """
+    n_updates = 7
+    eval_every = 3
+    distribution = DistributionGaussian(np.zeros(2), np.eye(2))
+    args = [TaskDistance(), TaskSolverIdentity(), distribution, UpdaterMean(), n_updates, 5]
+
+    with pytest.raises(ValueError):
+        run_optimization_task(*args, eval_every=0)
+
+    # Without and with saving the session to a directory
+    for directory in [None, tmp_path]:
+        session = run_optimization_task(*args, directory=directory, eval_every=eval_every)
+        assert session.get_n_updates() == n_updates
+        check_eval_every(session, n_updates, eval_every)
+
+
+def check_eval_every(session, n_updates, eval_every):
+    """ Check the evaluations of a learning session in which they were only performed every few
+    updates.
+
+    @param session: The learning session
+    @param n_updates: The number of updates in the learning session
+    @param eval_every: Evaluations were performed every eval_every updates
+    """
+    for i_update in range(n_updates):
+        assert session.exists("cost", i_update, "eval") == (i_update % eval_every == 0)
+        # Without an evaluation in this update, the most recent one is used
+        cost, i_update_eval = session.get_last_eval_cost(i_update)
+        assert i_update_eval == i_update - i_update % eval_every
+        assert np.array_equal(cost, session.ask("cost", i_update_eval, "eval"))
+        assert np.array_equal(session.get_eval_costs(i_update)[0], cost)
+
+    i_update_last_eval = n_updates - 1 - (n_updates - 1) % eval_every
+    assert session.get_last_eval_cost()[1] == i_update_last_eval
+
+
+def test_step_by_step_optimization_1d(tmp_path):
+    """ Test the step-by-step optimization of a DMP with a one-dimensional search space. """
+    traj = Trajectory.from_min_jerk(np.linspace(0.0, 1.0, 51), np.array([0.0]), np.array([1.0]))
+    dmp = Dmp.from_traj(traj, [FunctionApproximatorRBFN(3, 0.7)])
+    dmp.set_selected_param_names("goal")
+
+    n_samples = 5
+    eval_every = 2
+    distribution = DistributionGaussian(dmp.get_param_vector(), np.eye(1))
+    with pytest.raises(ValueError):
+        prepare_optimization(
+            tmp_path,
+            TaskDistance(),
+            TaskSolverIdentity(),
+            distribution,
+            n_samples,
+            UpdaterMean(),
+            eval_every=0,
+        )
+    prepare_optimization(
+        tmp_path,
+        TaskDistance(),
+        TaskSolverIdentity(),
+        distribution,
+        n_samples,
+        UpdaterMean(),
+        dmp_initial=dmp,
+        eval_every=eval_every,
+    )
+
+    for i_update in range(3):
+        # Load the session from the directory, as when rollouts are performed on a robot
+        session = LearningSessionTask.from_dir(tmp_path)
+        sample_labels = list(range(n_samples))
+        if i_update % eval_every == 0:
+            sample_labels.append("eval")
+        for i_sample in sample_labels:
+            param_vector = session.ask("dmp", i_update, i_sample).get_param_vector()
+            filename = session.tell(param_vector, "cost_vars", i_update, i_sample)
+            assert filename.endswith(".npy")  # Cost-relevant variables are stored in binary format
+        update_step(session, i_update)
+        # The samples for the next update are available, but it has not been performed yet
+        assert session.get_n_updates() == i_update + 1
+
+        assert session.exists("costs", i_update, "eval") == (i_update % eval_every == 0)
+        assert session.exists("distribution_new", i_update)
+        assert session.ask("distribution_new", i_update).mean.shape == (1,)
+
+
+class TaskSolverDmpEnd(TaskSolverDmp):
+    """ Task solver whose cost-relevant variables are the end-state of the DMP only. """
+
+    def perform_rollout_dmp(self, dmp):
+        """ Perform one rollout for a DMP.
+
+        @param dmp: The DMP to integrate.
+        @return: The last row of the trajectory generated by the DMP as a matrix.
+        """
+        return super().perform_rollout_dmp(dmp)[-1, :]
+
+
+def test_task_solver_dmp_batch():
+    """ Test whether rollouts for a batch of samples are the same as rollouts one by one. """
+    dmp = get_dmp()
+    params = dmp.get_param_vector()
+    rng = np.random.default_rng(0)
+    samples = params + rng.normal(0.0, 10.0, (4, params.size))
+
+    for task_solver in [TaskSolverDmp(dmp, 0.01, 1.2), TaskSolverDmpEnd(dmp, 0.01, 1.2)]:
+        cost_vars_batch = task_solver.perform_rollouts_batch(samples)
+        for sample, cost_vars in zip(samples, cost_vars_batch):
+            cost_vars_single = task_solver.perform_rollout(sample)
+            assert cost_vars.shape == cost_vars_single.shape
+            assert np.allclose(cost_vars, cost_vars_single)
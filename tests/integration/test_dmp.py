@@ -36,6 +36,31 @@ def test_dmp(tmp_path):
     main(tmp_path)
 
 
+def test_analytical_solution_batch():
+    """ Test whether analytical_solution_batch() is the same as analytical_solution() for each
+    parameter vector. """
+    traj = get_trajectory()
+    rng = np.random.default_rng(0)
+    dmp_types = ["IJSPEERT_2002_MOVEMENT", "KULVICIUS_2012_JOINING", "COUNTDOWN_2013", "2022"]
+    dmp_types += ["2022_NO_SCALING", "2022_DAMPING"]
+    for dmp_type in dmp_types:
+        for param_names in ["weights", "goal", ["goal", "weights"]]:
+            function_apps = [FunctionApproximatorRBFN(10, 0.7) for _ in range(traj.dim)]
+            dmp = Dmp.from_traj(traj, function_apps, dmp_type=dmp_type)
+            dmp.set_selected_param_names(param_names)
+            param_vector = dmp.get_param_vector()
+            param_vectors = param_vector + rng.normal(0.0, 0.1, (3, param_vector.size))
+
+            solutions_batch = dmp.analytical_solution_batch(param_vectors)
+            assert np.array_equal(dmp.get_param_vector(), param_vector)
+
+            for i_param, param_vector_sample in enumerate(param_vectors):
+                dmp.set_param_vector(param_vector_sample)
+                solutions = dmp.analytical_solution()
+                for solution_batch, solution in zip(solutions_batch, solutions):
+                    assert np.allclose(solution_batch[i_param], solution)
+
+
 def main(directory, **kwargs):
     """ Main function of the script. """
 
@@ -20,14 +20,19 @@
 import argparse
 import os
 import tempfile
+import warnings
 from pathlib import Path
 
 import matplotlib.pyplot as plt
 import numpy as np
+import pytest
 
 import dmpbbo.json_for_cpp as jc
+from dmpbbo.functionapproximators.FunctionApproximator import FunctionApproximator
+from dmpbbo.functionapproximators.FunctionApproximatorGPR import FunctionApproximatorGPR
 from dmpbbo.functionapproximators.FunctionApproximatorLWR import FunctionApproximatorLWR
 from dmpbbo.functionapproximators.FunctionApproximatorRBFN import FunctionApproximatorRBFN
+from dmpbbo.functionapproximators.FunctionApproximatorWLS import FunctionApproximatorWLS
 from tests.integration.execute_binary import execute_binary
 
 
@@ -149,6 +154,144 @@ def test_function_approximators(tmp_path):
     main(tmp_path)
 
 
+def test_rbfn_train_batch():
+    """ Test whether training RBFNs in a batch is the same as training them one by one. """
+    for n_samples_per_dim, n_bfs in [(25, 9), ([10, 10], [5, 5])]:
+        inputs, targets = target_function(n_samples_per_dim)
+        targets_batch = np.column_stack([targets, -2.0 * targets, targets + 1.0])
+
+        fas_batch = [FunctionApproximatorRBFN(n_bfs, 0.7) for _ in range(targets_batch.shape[1])]
+        FunctionApproximatorRBFN.train_batch(fas_batch, inputs, targets_batch)
+
+        for i_fa, fa_batch in enumerate(fas_batch):
+            fa = FunctionApproximatorRBFN(n_bfs, 0.7)
+            fa.train(inputs, targets_batch[:, i_fa])
+            assert fa_batch.dim_input() == fa.dim_input()
+            for name in ["centers", "widths", "weights"]:
+                fa_batch.set_selected_param_names(name)
+                fa.set_selected_param_names(name)
+                assert np.allclose(fa_batch.get_param_vector(), fa.get_param_vector())
+            assert np.allclose(fa_batch.predict(inputs), fa.predict(inputs))
+
+
+def test_rbfn_predict_shared_basis():
+    """ Test whether predicting with RBFNs with shared basis functions is the same as predicting
+    with them one by one. """
+    for n_samples_per_dim, n_bfs in [(25, 9), ([10, 10], [5, 5])]:
+        inputs, targets = target_function(n_samples_per_dim)
+        fas = [FunctionApproximatorRBFN(n_bfs, 0.7) for _ in range(3)]
+        for i_fa, fa in enumerate(fas):
+            fa.train(inputs, (i_fa - 1.0) * targets)
+        assert FunctionApproximatorRBFN.share_basis_functions(fas)
+
+        outputs = FunctionApproximatorRBFN.predict_shared_basis(fas, inputs)
+        assert outputs.shape == (inputs.shape[0], len(fas))
+        for i_fa, fa in enumerate(fas):
+            assert np.allclose(outputs[:, i_fa], fa.predict(inputs))
+
+    # Different basis functions
+    inputs, targets = target_function(25)
+    fas = [FunctionApproximatorRBFN(n_bfs, 0.7) for n_bfs in [9, 10]]
+    for fa in fas:
+        fa.train(inputs, targets)
+    assert not FunctionApproximatorRBFN.share_basis_functions(fas)
+
+
+def test_set_selected_param_names():
+    """ Test whether unknown parameter names are ignored, with one warning for all of them. """
+    inputs, targets = target_function(25)
+    fa = FunctionApproximatorRBFN(9, 0.7)
+    fa.train(inputs, targets)
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        fa.set_selected_param_names(["weights", "foo", "centers", "bar"])
+    assert len(caught) == 1
+    assert "foo" in str(caught[0].message) and "bar" in str(caught[0].message)
+    assert fa.get_param_vector_size() == 18  # 9 weights and 9 centers
+
+
+def test_get_param_vector():
+    """ Test whether the parameter vector changes after selecting other parameters, or retraining.
+    """
+    inputs, targets = target_function(25)
+    fa = FunctionApproximatorRBFN(5, 0.7)
+    fa.train(inputs, targets)
+
+    fa.set_selected_param_names("weights")
+    assert fa.get_param_vector_size() == 5
+    assert np.array_equal(fa.get_param_vector(), fa._model_params["weights"].ravel())
+
+    fa.set_selected_param_names(["centers", "weights"])
+    assert fa.get_param_vector_size() == 10
+    expected = np.concatenate([fa._model_params[n].ravel() for n in ["centers", "weights"]])
+    assert np.array_equal(fa.get_param_vector(), expected)
+
+    # Retraining with 2D inputs changes the number of centers: 5x5 centers with 2 coordinates each
+    inputs, targets = target_function([10, 10])
+    fa.train(inputs, targets)
+    assert fa.get_param_vector_size() == 50 + 25
+    expected = np.concatenate([fa._model_params[n].ravel() for n in ["centers", "weights"]])
+    assert np.array_equal(fa.get_param_vector(), expected)
+    fa.set_param_vector(2.0 * expected)
+    assert np.array_equal(fa.get_param_vector(), 2.0 * expected)
+
+
+def test_get_grid():
+    """ Test grids of input samples for 1, 2 and 3 dimensions, and that cached grids cannot be
+    changed by callers. """
+    for n_dims, n_samples_per_dim in [(1, [101]), (2, [21, 21]), (3, [11, 11, 11])]:
+        inputs_min = np.linspace(-1.0, 0.0, n_dims)
+        inputs_max = np.linspace(1.0, 2.0, n_dims)
+        inputs, n_samples = FunctionApproximator._get_grid(inputs_min, inputs_max)
+        assert np.array_equal(np.atleast_1d(n_samples), n_samples_per_dim)
+
+        # Reference: the last dimension varies fastest
+        axes = [
+            np.linspace(inputs_min[i], inputs_max[i], n_samples_per_dim[i]) for i in range(n_dims)
+        ]
+        expected = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, n_dims)
+        assert np.allclose(inputs.reshape(-1, n_dims), expected)
+
+        # The same grid is returned from the cache, and it cannot be changed
+        inputs_again, _ = FunctionApproximator._get_grid(inputs_min, inputs_max)
+        assert inputs_again is inputs
+        with pytest.raises(ValueError):
+            inputs[0] = 0.0
+
+    inputs, n_samples = FunctionApproximator._get_grid([0.0, 0.0], [1.0, 1.0], [3, 4])
+    assert inputs.shape == (12, 2)
+    assert np.array_equal(n_samples, [3, 4])
+
+
+def test_set_param_vector():
+    """ Test whether set_param_vector() does not change the values passed to it afterwards. """
+    inputs, targets = target_function(25)
+    fa = FunctionApproximatorWLS()
+    fa.train(inputs, targets)
+    fa.set_selected_param_names(["slope", "offset"])
+
+    values_a = np.array([1.0, 2.0])
+    fa.set_param_vector(values_a)
+    values_b = np.array([7.0, 8.0])
+    fa.set_param_vector(values_b)
+
+    assert np.array_equal(values_a, [1.0, 2.0])
+    assert np.array_equal(fa.get_param_vector(), values_b)
+
+
+def test_gpr_predict():
+    """ Test the shape of the predictions of GPR, also when trained with a column of targets. """
+    inputs, targets = target_function(25)
+    inputs_test = np.linspace(0.0, 2.0, 30)
+    for cur_targets in [targets, targets.reshape(-1, 1)]:
+        fa = FunctionApproximatorGPR(1.0, 0.1)
+        fa.train(inputs, cur_targets)
+        outputs = fa.predict(inputs_test)
+        assert outputs.shape == (inputs_test.shape[0],)
+        assert np.allclose(fa.predict(inputs), targets, atol=1e-3)
+
+
 def main(directory, **kwargs):
     """ Main function of the script. """
     directory.mkdir(parents=True, exist_ok=True)